@@ -1,29 +1,31 @@
+import hmac
 from fastapi import APIRouter, Depends, HTTPException, Header
 from sqlmodel import Session
 from typing import Optional
 from app.core.db import get_session
-from app.core.settings import settings
+from app.core.settings import get_settings
 from app.core.logging import get_logger
+from app.core.orjson_response import ORJSONResponse
 from app.repositories.agent_run_repo import AgentRunRepository
 from app.schemas.agent_run import AgentRunPayload, AgentRunResponse, TimelineEvent
 
-router = APIRouter(prefix="/agent-runs", tags=["Agent Runs"])
+router = APIRouter(prefix="/agent-runs", tags=["Agent Runs"], default_response_class=ORJSONResponse)
 logger = get_logger(__name__)
 
 
 def verify_ingest_secret(x_ingest_secret: Optional[str] = Header(None)) -> None:
-    """Verify ingest secret if configured."""
-    if settings.app_ingest_secret:
-        if not x_ingest_secret or x_ingest_secret != settings.app_ingest_secret:
-            raise HTTPException(status_code=403, detail="Invalid or missing ingest secret")
+    """Verify ingest secret if configured (empty means ingestion is unauthenticated)."""
+    ingest_secret = get_settings().app_ingest_secret
+    if not ingest_secret:
+        return
+    if not x_ingest_secret or not hmac.compare_digest(
+        x_ingest_secret.encode(), ingest_secret.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Invalid or missing ingest secret")
 
 
-@router.post("", response_model=dict)
-def ingest_agent_run(
-    payload: AgentRunPayload,
-    session: Session = Depends(get_session),
-    _auth: None = Depends(verify_ingest_secret),
-):
+@router.post("", dependencies=[Depends(verify_ingest_secret)])
+def ingest_agent_run(payload: AgentRunPayload, session: Session = Depends(get_session)):
     """Ingest agent run telemetry."""
     repo = AgentRunRepository(session)
     run_id = repo.upsert_agent_run(payload)
@@ -62,4 +64,6 @@ def get_agent_run_timeline(run_id: str, session: Session = Depends(get_session))
     if not timeline:
         raise HTTPException(status_code=404, detail="Agent run not found")
 
-    return timeline
+    # Returned as a response directly so FastAPI doesn't re-validate every
+    # event against response_model (kept for the OpenAPI schema)
+    return ORJSONResponse(timeline)
@@ -1,48 +1,92 @@
+from functools import lru_cache
 from uuid import uuid4
+import orjson
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session
 from rq import Queue
 from app.core.db import get_session
 from app.core.redis_clients import get_sync_redis
-from app.core.settings import settings
+from app.core.settings import get_settings
 from app.core.logging import get_logger
-from app.repositories.agent_run_repo import AgentRunRepository
+from app.core.orjson_response import ORJSONResponse
 from app.repositories.rca_repo import RCARepository
-from app.schemas.rca import RCARunResponse, RCAReport
+from app.schemas.rca import RCARunResponse, RCARunBulkRequest
 
-router = APIRouter(prefix="/agent-runs", tags=["RCA"])
+router = APIRouter(prefix="/agent-runs", tags=["RCA"], default_response_class=ORJSONResponse)
 logger = get_logger(__name__)
 
 
-@router.post("/{run_id}/rca-runs", response_model=dict)
+@lru_cache(maxsize=1)
+def get_rca_queue() -> Queue:
+    """Get the RCA queue.
+
+    Built once, on first use: the queue holds no per-request state, and RQ
+    caches the Redis server version on it and on the shared connection after
+    the first enqueue.
+    """
+    return Queue(get_settings().rq_queue_name, connection=get_sync_redis())
+
+
+@router.post("/{run_id}/rca-runs")
 def create_rca_run(run_id: str, session: Session = Depends(get_session)):
     """Create RCA run and enqueue job."""
-    # Check if agent run exists
-    agent_run_repo = AgentRunRepository(session)
-    if not agent_run_repo.get_agent_run(run_id):
-        raise HTTPException(status_code=404, detail="Agent run not found")
-
     rca_repo = RCARepository(session)
 
-    # Check for recent RCA run (idempotency)
-    existing_rca = rca_repo.find_recent_rca_run(run_id, minutes=10)
-    if existing_rca:
-        logger.info(f"Found existing RCA run {existing_rca.rca_run_id} for run {run_id}")
-        return {"rca_run_id": existing_rca.rca_run_id}
+    # Check that the agent run exists and for a recent RCA run (idempotency)
+    run_exists, existing_rca_run_id = rca_repo.find_run_and_recent_rca_run(run_id, minutes=10)
+    if not run_exists:
+        raise HTTPException(status_code=404, detail="Agent run not found")
+    if existing_rca_run_id:
+        logger.info(f"Found existing RCA run {existing_rca_run_id} for run {run_id}")
+        return {"rca_run_id": existing_rca_run_id}
 
     # Create new RCA run
     rca_run_id = str(uuid4())
     rca_repo.create_rca_run(rca_run_id, run_id)
 
     # Enqueue RQ job
-    redis_client = get_sync_redis()
-    queue = Queue(settings.rq_queue_name, connection=redis_client)
-    queue.enqueue("app.workers.tasks.run_rca_job", rca_run_id)
+    get_rca_queue().enqueue("app.workers.tasks.run_rca_job", rca_run_id)
 
     logger.info(f"Created RCA run {rca_run_id} for agent run {run_id}")
     return {"rca_run_id": rca_run_id}
 
 
+@router.post("/rca-runs")
+def create_rca_runs_bulk(request: RCARunBulkRequest, session: Session = Depends(get_session)):
+    """Create RCA runs for several agent runs and enqueue their jobs in one batch."""
+    rca_repo = RCARepository(session)
+
+    # Existence and idempotency checks for every run in one query
+    recent_rca_run_ids = rca_repo.find_runs_and_recent_rca_runs(request.run_ids, minutes=10)
+
+    rca_run_ids = {}
+    not_found = []
+    new_rows = []
+    for run_id in dict.fromkeys(request.run_ids):
+        if run_id not in recent_rca_run_ids:
+            not_found.append(run_id)
+        elif recent_rca_run_ids[run_id]:
+            rca_run_ids[run_id] = recent_rca_run_ids[run_id]
+        else:
+            rca_run_ids[run_id] = str(uuid4())
+            new_rows.append((rca_run_ids[run_id], run_id))
+
+    if new_rows:
+        # One INSERT for the rows, one Redis pipeline for the jobs
+        rca_repo.create_rca_runs_bulk(new_rows)
+        get_rca_queue().enqueue_many(
+            [
+                Queue.prepare_data("app.workers.tasks.run_rca_job", (rca_run_id,))
+                for rca_run_id, _ in new_rows
+            ]
+        )
+
+    logger.info(
+        f"Created {len(new_rows)} RCA runs, reused {len(rca_run_ids) - len(new_rows)} recent ones"
+    )
+    return {"rca_run_ids": rca_run_ids, "not_found": not_found}
+
+
 @router.get("/rca-runs/{rca_run_id}", response_model=RCARunResponse)
 def get_rca_run(rca_run_id: str, session: Session = Depends(get_session)):
     """Get RCA run status and report if ready."""
@@ -52,14 +96,7 @@ def get_rca_run(rca_run_id: str, session: Session = Depends(get_session)):
     if not rca_run:
         raise HTTPException(status_code=404, detail="RCA run not found")
 
-    # Get report if done
-    report = None
-    if rca_run.status == "done":
-        report_model = rca_repo.get_rca_report(rca_run_id)
-        if report_model:
-            report = RCAReport(**report_model.report_json)
-
-    return RCARunResponse(
+    response = RCARunResponse(
         rca_run_id=rca_run.rca_run_id,
         run_id=rca_run.run_id,
         status=rca_run.status,
@@ -70,5 +107,13 @@ def get_rca_run(rca_run_id: str, session: Session = Depends(get_session)):
         started_at=rca_run.started_at,
         ended_at=rca_run.ended_at,
         error_message=rca_run.error_message,
-        report=report,
-    )
+    ).model_dump(mode="json")
+
+    # Embed the stored report JSON as-is; it was written from RCAReport.model_dump,
+    # so decoding and re-validating it here would only round-trip the same bytes
+    if rca_run.status == "done":
+        report_json = rca_repo.get_rca_report_raw_json(rca_run_id)
+        if report_json:
+            response["report"] = orjson.Fragment(report_json)
+
+    return ORJSONResponse(response)
@@ -1,4 +1,4 @@
-import json
+import orjson
 import asyncio
 from fastapi import APIRouter, HTTPException
 from sse_starlette.sse import EventSourceResponse
@@ -17,11 +17,12 @@ async def event_generator(rca_run_id: str):
     try:
         await pubsub.subscribe(channel)
 
-        # Immediately send latest status snapshot
+        # Immediately send latest status snapshot (sync client, so read it off
+        # the event loop instead of blocking every other stream meanwhile)
         progress_service = ProgressService()
-        latest_status = progress_service.get_latest_status(rca_run_id)
+        latest_status = await asyncio.to_thread(progress_service.get_latest_status, rca_run_id)
         if latest_status:
-            yield {"data": json.dumps(latest_status)}
+            yield {"data": orjson.dumps(latest_status).decode("utf-8")}
 
         # Listen for new events
         async for message in pubsub.listen():
@@ -30,10 +31,10 @@ async def event_generator(rca_run_id: str):
 
                 # Stop streaming if done or error
                 try:
-                    event_data = json.loads(message["data"])
+                    event_data = orjson.loads(message["data"])
                     if event_data.get("status") in ["done", "error"]:
                         break
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     pass
 
     except asyncio.CancelledError:
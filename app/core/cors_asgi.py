@@ -0,0 +1,169 @@
+from typing import Sequence
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+ALL_METHODS = ("DELETE", "GET", "HEAD", "OPTIONS", "PATCH", "POST", "PUT")
+SAFELISTED_HEADERS = frozenset({b"accept", b"accept-language", b"content-language", b"content-type"})
+
+
+class PureCORSMiddleware:
+    """Pure ASGI CORS middleware.
+
+    Follows the semantics of Starlette's CORSMiddleware, but reads the request
+    headers straight from the scope and encodes every response header once at
+    startup, so no Headers objects or strings are built per request. Preflight
+    requests are answered here without reaching the app.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        allow_origins: Sequence[str] = (),
+        allow_methods: Sequence[str] = ("GET",),
+        allow_headers: Sequence[str] = (),
+        allow_credentials: bool = False,
+        expose_headers: Sequence[str] = (),
+        max_age: int = 600,
+    ) -> None:
+        if "*" in allow_methods:
+            allow_methods = ALL_METHODS
+
+        self.app = app
+        self.allow_all_origins = "*" in allow_origins
+        self.allow_origins = frozenset(origin.encode("latin-1") for origin in allow_origins)
+        self.allow_methods = frozenset(method.encode("latin-1") for method in allow_methods)
+        self.allow_all_headers = "*" in allow_headers
+        self.allow_headers = SAFELISTED_HEADERS | {header.lower().encode("latin-1") for header in allow_headers}
+
+        # Browsers reject a "*" origin on credentialed requests, so echo the
+        # request origin instead and tell caches the response depends on it
+        self.echo_origin = allow_credentials or not self.allow_all_origins
+
+        simple_headers = []
+        if allow_credentials:
+            simple_headers.append((b"access-control-allow-credentials", b"true"))
+        if expose_headers:
+            simple_headers.append(
+                (b"access-control-expose-headers", ", ".join(expose_headers).encode("latin-1"))
+            )
+        self.simple_headers = simple_headers
+
+        # Full header list per configured origin, so allowed requests only
+        # need a dict lookup to find the headers to append
+        self.simple_headers_by_origin = {
+            origin: [(b"access-control-allow-origin", self.allow_origin_value(origin)), *simple_headers]
+            for origin in self.allow_origins
+        }
+
+        preflight_headers = [
+            (b"access-control-allow-methods", ", ".join(allow_methods).encode("latin-1")),
+            (b"access-control-max-age", str(max_age).encode("latin-1")),
+        ]
+        if allow_credentials:
+            preflight_headers.append((b"access-control-allow-credentials", b"true"))
+        if not self.allow_all_headers:
+            preflight_headers.append(
+                (b"access-control-allow-headers", b", ".join(sorted(self.allow_headers)))
+            )
+        if self.echo_origin:
+            preflight_headers.append((b"vary", b"Origin"))
+        self.preflight_headers = preflight_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = request_method = request_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            await self.preflight_response(origin, request_method, request_headers, send)
+            return
+
+        cors_headers = self.simple_headers_by_origin.get(origin)
+        if cors_headers is None:
+            if not self.allow_all_origins:
+                await self.app(scope, receive, send)
+                return
+            cors_headers = [
+                (b"access-control-allow-origin", self.allow_origin_value(origin)),
+                *self.simple_headers,
+            ]
+
+        async def send_with_cors_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                headers.extend(cors_headers)
+                if self.echo_origin:
+                    add_vary_origin(headers)
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors_headers)
+
+    def is_allowed_origin(self, origin: bytes) -> bool:
+        return self.allow_all_origins or origin in self.allow_origins
+
+    def allow_origin_value(self, origin: bytes) -> bytes:
+        return origin if self.echo_origin else b"*"
+
+    async def preflight_response(
+        self,
+        origin: bytes,
+        request_method: bytes,
+        request_headers: bytes | None,
+        send: Send,
+    ) -> None:
+        failures = []
+        if not self.is_allowed_origin(origin):
+            failures.append("origin")
+        if request_method not in self.allow_methods:
+            failures.append("method")
+        if request_headers and not self.allow_all_headers:
+            for header in request_headers.split(b","):
+                if header.strip().lower() not in self.allow_headers:
+                    failures.append("headers")
+                    break
+
+        if failures:
+            body = ("Disallowed CORS " + ", ".join(failures)).encode("utf-8")
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 400,
+                    "headers": [
+                        (b"content-type", b"text/plain; charset=utf-8"),
+                        (b"content-length", str(len(body)).encode("latin-1")),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        headers = [(b"access-control-allow-origin", self.allow_origin_value(origin))]
+        headers.extend(self.preflight_headers)
+        if self.allow_all_headers and request_headers:
+            headers.append((b"access-control-allow-headers", request_headers))
+        await send({"type": "http.response.start", "status": 204, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
+
+
+def add_vary_origin(headers: list) -> None:
+    """Add Origin to the Vary header, merging with any existing value."""
+    for index, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            tokens = {token.strip().lower() for token in value.split(b",")}
+            if b"origin" not in tokens:
+                headers[index] = (name, value + b", Origin")
+            return
+    headers.append((b"vary", b"Origin"))
@@ -1,13 +1,37 @@
+import os
+import orjson
+from sqlalchemy.orm import sessionmaker
 from sqlmodel import create_engine, Session, SQLModel
-from app.core.settings import settings
+from app.core.settings import get_settings
 
-# Create engine
+
+def _json_serializer(value) -> str:
+    """Serialize JSON column values with orjson."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+# Create engine (JSON columns - run cost, tool args, RCA reports - go through orjson).
+# Connections are recycled hourly, before server-side idle timeouts. Recycling
+# doesn't catch connections killed by a Postgres restart or failover, so pooled
+# connections are also pinged on checkout unless DB_POOL_PRE_PING is off.
 engine = create_engine(
-    settings.database_url,
-    echo=settings.app_env == "development",
-    pool_pre_ping=True,
+    get_settings().database_url,
+    echo=get_settings().app_env == "development",
+    pool_size=get_settings().db_pool_size,
+    pool_pre_ping=get_settings().db_pool_pre_ping,
+    pool_recycle=3600,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
 )
 
+# Forked processes (worker pool members, RQ job processes) must not reuse the
+# parent's pooled connections; give each child a fresh pool
+os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
+
+# Session factory for background jobs; objects stay loaded after commit, so
+# reading them afterwards doesn't re-SELECT
+SessionLocal = sessionmaker(engine, class_=Session, expire_on_commit=False)
+
 
 def init_db() -> None:
     """Create all tables."""
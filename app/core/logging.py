@@ -1,56 +1,185 @@
+import atexit
+import copy
 import logging
-import json
+import os
+import queue
 import sys
-from datetime import datetime
-from typing import Any
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
 from contextvars import ContextVar
 
-from app.core.settings import settings
+import orjson
+
+from app.core.settings import get_settings
 
 # Context variable for request ID correlation
 request_id_var: ContextVar[str] = ContextVar("request_id", default="")
 
+# Background listener that drains queued records to stdout (see setup_logging)
+_listener: Optional[QueueListener] = None
+
 
 class JSONFormatter(logging.Formatter):
     """Format logs as JSON with request_id correlation."""
 
     def format(self, record: logging.LogRecord) -> str:
+        return self.to_json(record).decode("utf-8")
+
+    def to_json(self, record: logging.LogRecord) -> bytes:
+        """Render the record as JSON bytes."""
         log_data: dict[str, Any] = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            # Use the time the record was created: formatting happens later, on
+            # the listener thread, and this skips a clock read per record
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
         }
 
-        # Add request_id if present
-        request_id = request_id_var.get()
+        # Add request_id if present (captured on the logging thread when queued)
+        request_id = getattr(record, "request_id", None)
+        if request_id is None:
+            request_id = request_id_var.get()
         if request_id:
             log_data["request_id"] = request_id
 
         # Add exception info if present
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_data["exception"] = record.exc_text
 
         # Add any extra fields
         if hasattr(record, "extra_fields"):
             log_data.update(record.extra_fields)
 
-        return json.dumps(log_data)
+        # orjson renders UTC timestamps (naive ones assumed UTC) as RFC 3339 with "Z"
+        return orjson.dumps(
+            log_data,
+            default=str,
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z,
+        )
+
+
+class JSONStdoutHandler(logging.Handler):
+    """Write JSON log lines to stdout.
+
+    Lines go through the text layer of sys.stdout, the same one print() and
+    other stream handlers (e.g. SQLAlchemy echo) use, so output from all of
+    them stays in order.
+    """
+
+    def __init__(self, flush_each: bool = False):
+        super().__init__()
+        self.formatter = JSONFormatter()
+        self.flush_each = flush_each
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            sys.stdout.write(self.formatter.format(record) + "\n")
+            if self.flush_each:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        _flush_stdout()
+
+
+class RequestContextQueueHandler(QueueHandler):
+    """Queue handler that resolves everything tied to the calling thread.
+
+    The request ID lives in a context variable and exceptions hold live
+    tracebacks, so both are rendered before the record crosses threads.
+    """
+
+    _exc_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.request_id = request_id_var.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class BatchingQueueListener(QueueListener):
+    """Queue listener that flushes its handlers only once the queue drains."""
+
+    def handle(self, record: logging.LogRecord) -> None:
+        super().handle(record)
+        if self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+
+
+def _stop_listener() -> None:
+    """Drain queued records and stop the background listener."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.flush()
+    _listener = None
+
+
+def _log_directly_after_fork() -> None:
+    """Swap the queue for a direct handler in forked children.
+
+    The listener thread does not survive fork, and RQ work horses exit with
+    os._exit, so a child could otherwise lose everything it logs.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener = None
+
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        if isinstance(handler, RequestContextQueueHandler):
+            root_logger.removeHandler(handler)
+    root_logger.addHandler(JSONStdoutHandler(flush_each=True))
+
+
+def _flush_stdout() -> None:
+    """Flush stdout before fork so children don't inherit (and re-emit) buffered lines."""
+    try:
+        sys.stdout.flush()
+    except (OSError, ValueError):
+        pass
+
+
+atexit.register(_stop_listener)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_flush_stdout, after_in_child=_log_directly_after_fork)
 
 
 def setup_logging() -> None:
-    """Configure JSON logging."""
+    """Configure JSON logging.
+
+    Records are queued by the calling thread and written to stdout by a
+    background listener, so request handlers never block on stdout.
+    """
+    global _listener
+
     root_logger = logging.getLogger()
-    root_logger.setLevel(getattr(logging, settings.log_level.upper()))
+    root_logger.setLevel(getattr(logging, get_settings().log_level.upper()))
 
-    # Remove existing handlers
+    # Remove existing handlers (and stop the listener of a previous setup)
+    _stop_listener()
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
 
-    # Add JSON handler
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(JSONFormatter())
-    root_logger.addHandler(handler)
+    # Add JSON handler behind a queue
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = BatchingQueueListener(log_queue, JSONStdoutHandler(), respect_handler_level=True)
+    _listener.start()
+    root_logger.addHandler(RequestContextQueueHandler(log_queue))
 
 
 def get_logger(name: str) -> logging.Logger:
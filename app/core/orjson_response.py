@@ -0,0 +1,20 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic_core import to_jsonable_python
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson.
+
+    Falls back to pydantic's encoder for anything orjson does not handle
+    natively (e.g. models returned directly from a route).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=to_jsonable_python,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z,
+        )
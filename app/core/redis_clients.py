@@ -1,19 +1,44 @@
+from functools import lru_cache
 import redis
 import redis.asyncio as aioredis
-from app.core.settings import settings
+from app.core.settings import get_settings
 
-# Sync Redis client for RQ (must keep binary payloads intact)
-sync_redis_client = redis.from_url(settings.redis_url, decode_responses=False)
+# Both clients pool their connections (capped per process); keepalive and the
+# periodic health check catch dropped sockets before a command fails on them.
+# Replies are parsed by hiredis (C) when it is installed, which redis-py picks
+# automatically.
+REDIS_CONNECTION_OPTIONS = {
+    "socket_keepalive": True,
+    "health_check_interval": 30,
+}
 
-# Async Redis client for SSE pub/sub (string responses are convenient)
-async_redis_client = aioredis.from_url(settings.redis_url, decode_responses=True)
+_async_redis_client: aioredis.Redis | None = None
 
 
+@lru_cache(maxsize=1)
 def get_sync_redis() -> redis.Redis:
-    """Get sync Redis client."""
-    return sync_redis_client
+    """Get sync Redis client for RQ (must keep binary payloads intact)."""
+    return redis.from_url(
+        get_settings().redis_url,
+        decode_responses=False,
+        max_connections=get_settings().redis_pool_size,
+        **REDIS_CONNECTION_OPTIONS,
+    )
 
 
 async def get_async_redis() -> aioredis.Redis:
-    """Get async Redis client."""
-    return async_redis_client
+    """Get async Redis client for SSE pub/sub (string responses are convenient).
+
+    Created on first use, inside the running event loop, rather than at import.
+    There is no await between the check and the assignment, so concurrent
+    callers on the loop can't race to build two clients.
+    """
+    global _async_redis_client
+    if _async_redis_client is None:
+        _async_redis_client = aioredis.from_url(
+            get_settings().redis_url,
+            decode_responses=True,
+            max_connections=get_settings().redis_pool_size,
+            **REDIS_CONNECTION_OPTIONS,
+        )
+    return _async_redis_client
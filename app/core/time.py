@@ -0,0 +1,10 @@
+from datetime import datetime, timezone
+
+
+def utcnow() -> datetime:
+    """Current UTC time as a naive datetime.
+
+    Timestamp columns are TIMESTAMP WITHOUT TIME ZONE holding UTC, so the
+    value stays naive; datetime.utcnow itself is deprecated from Python 3.12.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -1,18 +1,27 @@
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from app.core.logging import setup_logging
+from app.core.logging import setup_logging, get_logger
+from app.core.cors_asgi import PureCORSMiddleware
 from app.core.db import init_db
-from app.core.settings import settings
+from app.core.orjson_response import ORJSONResponse
+from app.core.settings import get_settings
 from app.api import agent_runs, rca_runs, stream, metrics
 
+logger = get_logger(__name__)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifecycle management."""
     # Startup
     setup_logging()
-    init_db()
+    # create_all introspects every table; only do it for local development so
+    # each production worker doesn't repeat it on boot
+    app_env = get_settings().app_env
+    if app_env == "development":
+        init_db()
+    else:
+        logger.info(f"Skipping init_db in {app_env}; create tables explicitly")
     yield
     # Shutdown
     pass
@@ -23,6 +32,7 @@ app = FastAPI(
     description="Production-lean AgentOps MVP with RCA capabilities",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware - MUST be added before routers
@@ -30,14 +40,14 @@ app = FastAPI(
 # 1. Browser fetch() calls from Next.js UI (localhost:3000)
 # 2. SSE streaming (EventSource requires CORS for cross-origin)
 # 3. Preflight OPTIONS requests
-cors_origins = settings.get_cors_origins()
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=cors_origins,
+    PureCORSMiddleware,
+    allow_origins=get_settings().cors_origins_list,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
     expose_headers=["*"],  # Required for SSE to work properly
+    max_age=86400,  # Let browsers cache preflights for a day (default is 10 min)
 )
 
 # Include routers
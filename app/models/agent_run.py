@@ -1,10 +1,21 @@
 from datetime import datetime
-from typing import Optional
-from sqlmodel import SQLModel, Field, Column, JSON
+from typing import List, Optional
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import SQLModel, Field, Column, JSON, Relationship, Index
+from app.core.time import utcnow
+
+# Generic JSON, stored as JSONB on Postgres (parsed binary form, GIN-indexable)
+JSONVariant = JSON().with_variant(JSONB(), "postgresql")
 
 
 class AgentRun(SQLModel, table=True):
     __tablename__ = "agent_runs"
+    # Lets Postgres answer containment lookups (correlation_ids @> / ?) from the index
+    __table_args__ = (
+        Index(
+            "ix_agent_runs_correlation_ids_gin", "correlation_ids", postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+    )
 
     run_id: str = Field(primary_key=True)
     agent_name: str = Field(index=True)
@@ -17,16 +28,29 @@ class AgentRun(SQLModel, table=True):
     error_type: Optional[str] = Field(default=None, index=True)
     error_message: Optional[str] = None
     trace_id: Optional[str] = Field(default=None, index=True)
-    correlation_ids: list = Field(default=[], sa_column=Column(JSON))
-    cost: dict = Field(default={}, sa_column=Column(JSON))
-    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    correlation_ids: list = Field(default=[], sa_column=Column(JSONVariant))
+    cost: dict = Field(default={}, sa_column=Column(JSONVariant))
+    created_at: datetime = Field(default_factory=utcnow, index=True)
+
+    steps: List["AgentStep"] = Relationship(
+        back_populates="run",
+        sa_relationship_kwargs={"order_by": "AgentStep.started_at"},
+    )
+    tool_calls: List["ToolCall"] = Relationship(back_populates="run")
+    guardrail_events: List["GuardrailEvent"] = Relationship(
+        back_populates="run",
+        sa_relationship_kwargs={"order_by": "GuardrailEvent.created_at"},
+    )
 
 
 class AgentStep(SQLModel, table=True):
     __tablename__ = "agent_steps"
+    # Timeline and RCA reads fetch a run's steps ordered by start time; the
+    # composite index serves both the filter and the sort (and run_id lookups)
+    __table_args__ = (Index("ix_agent_steps_run_id_started_at", "run_id", "started_at"),)
 
     step_id: str = Field(primary_key=True)
-    run_id: str = Field(foreign_key="agent_runs.run_id", index=True)
+    run_id: str = Field(foreign_key="agent_runs.run_id")
     name: str
     status: str = Field(index=True)
     started_at: datetime = Field(index=True)
@@ -36,6 +60,8 @@ class AgentStep(SQLModel, table=True):
     input_summary: str
     output_summary: str
 
+    run: Optional[AgentRun] = Relationship(back_populates="steps")
+
 
 class ToolCall(SQLModel, table=True):
     __tablename__ = "tool_calls"
@@ -45,7 +71,7 @@ class ToolCall(SQLModel, table=True):
     step_id: str = Field(foreign_key="agent_steps.step_id", index=True)
     tool_name: str = Field(index=True)
     status: str = Field(index=True)
-    args_json: dict = Field(default={}, sa_column=Column(JSON))
+    args_json: dict = Field(default={}, sa_column=Column(JSONVariant))
     args_hash: str
     result_summary: str
     error_class: Optional[str] = Field(default=None, index=True)
@@ -54,14 +80,19 @@ class ToolCall(SQLModel, table=True):
     latency_ms: int
     retries: int = 0
 
+    run: Optional[AgentRun] = Relationship(back_populates="tool_calls")
+
 
 class GuardrailEvent(SQLModel, table=True):
     __tablename__ = "guardrail_events"
+    __table_args__ = (Index("ix_guardrail_events_run_id_created_at", "run_id", "created_at"),)
 
     event_id: str = Field(primary_key=True)
-    run_id: str = Field(foreign_key="agent_runs.run_id", index=True)
+    run_id: str = Field(foreign_key="agent_runs.run_id")
     step_id: Optional[str] = Field(default=None, foreign_key="agent_steps.step_id")
     call_id: Optional[str] = Field(default=None, foreign_key="tool_calls.call_id")
     type: str = Field(index=True)
     message: str
-    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    created_at: datetime = Field(default_factory=utcnow, index=True)
+
+    run: Optional[AgentRun] = Relationship(back_populates="guardrail_events")
@@ -1,6 +1,17 @@
 from datetime import datetime
 from typing import Optional
+from sqlalchemy import Enum as SAEnum
 from sqlmodel import SQLModel, Field, Column, JSON
+from app.core.time import utcnow
+from app.schemas.rca import RCARunStatus
+
+# Native enum type on Postgres (4-byte values in the status index); stores the
+# lowercase enum values rather than the member names
+RCARunStatusType = SAEnum(
+    RCARunStatus,
+    name="rca_run_status",
+    values_callable=lambda statuses: [status.value for status in statuses],
+)
 
 
 class RCArun(SQLModel, table=True):
@@ -8,11 +19,11 @@ class RCArun(SQLModel, table=True):
 
     rca_run_id: str = Field(primary_key=True)
     run_id: str = Field(foreign_key="agent_runs.run_id", index=True)
-    status: str = Field(index=True)  # queued, running, done, error
+    status: RCARunStatus = Field(sa_column=Column(RCARunStatusType, nullable=False, index=True))
     step: str = ""
     pct: int = 0
     message: str = ""
-    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    created_at: datetime = Field(default_factory=utcnow, index=True)
     started_at: Optional[datetime] = None
     ended_at: Optional[datetime] = None
     error_message: Optional[str] = None
@@ -27,4 +38,4 @@ class RCAReport(SQLModel, table=True):
     report_json: dict = Field(sa_column=Column(JSON))
     insufficient_evidence: bool = Field(default=False, index=True)
     category: str = Field(index=True)
-    generated_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    generated_at: datetime = Field(default_factory=utcnow, index=True)
@@ -1,11 +1,15 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from sqlmodel import Session, select, func, desc
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select, insert, delete, func, desc, case, literal, null, type_coerce, union_all, JSON
+from app.core.time import utcnow
 from app.models.agent_run import AgentRun, AgentStep, ToolCall, GuardrailEvent
 from app.schemas.agent_run import AgentRunPayload, TimelineEvent
 
 
 class AgentRunRepository:
+    __slots__ = ("session",)
+
     def __init__(self, session: Session):
         self.session = session
 
@@ -19,14 +23,12 @@ class AgentRunRepository:
             # Update existing
             for key, value in payload.model_dump(exclude={"steps", "tool_calls", "guardrail_events"}).items():
                 setattr(existing_run, key, value)
-            # Delete existing children
-            self.session.exec(select(AgentStep).where(AgentStep.run_id == run_id)).all()
-            for step in self.session.exec(select(AgentStep).where(AgentStep.run_id == run_id)):
-                self.session.delete(step)
-            for tool_call in self.session.exec(select(ToolCall).where(ToolCall.run_id == run_id)):
-                self.session.delete(tool_call)
-            for event in self.session.exec(select(GuardrailEvent).where(GuardrailEvent.run_id == run_id)):
-                self.session.delete(event)
+            # Delete existing children in bulk, dependents first (for FK constraints)
+            for model in (GuardrailEvent, ToolCall, AgentStep):
+                self.session.exec(
+                    delete(model).where(model.run_id == run_id),
+                    execution_options={"synchronize_session": False},
+                )
         else:
             # Create new
             run = AgentRun(
@@ -34,23 +36,21 @@ class AgentRunRepository:
             )
             self.session.add(run)
 
-        # Insert steps
-        for step_data in payload.steps:
-            step = AgentStep(**step_data.model_dump(), run_id=run_id)
-            self.session.add(step)
-
-        # Insert tool calls
-        for tool_call_data in payload.tool_calls:
-            tool_call = ToolCall(**tool_call_data.model_dump(), run_id=run_id)
-            self.session.add(tool_call)
-
-        # Flush to ensure steps and tool_calls are committed before guardrails (for FK constraints)
+        # Flush the run row so children can reference it (for FK constraints)
         self.session.flush()
 
-        # Insert guardrail events
-        for event_data in payload.guardrail_events:
-            event = GuardrailEvent(**event_data.model_dump(), run_id=run_id)
-            self.session.add(event)
+        # Insert children with one executemany INSERT per table; statements run in
+        # order, so steps and tool calls exist before the guardrails referencing them
+        for model, children in (
+            (AgentStep, payload.steps),
+            (ToolCall, payload.tool_calls),
+            (GuardrailEvent, payload.guardrail_events),
+        ):
+            if children:
+                self.session.exec(
+                    insert(model),
+                    params=[child.model_dump() | {"run_id": run_id} for child in children],
+                )
 
         self.session.commit()
         return run_id
@@ -59,112 +59,154 @@ class AgentRunRepository:
         """Get agent run by ID."""
         return self.session.get(AgentRun, run_id)
 
+    def exists(self, run_id: str) -> bool:
+        """Check whether an agent run exists without loading it."""
+        return self.session.scalar(
+            select(select(AgentRun.run_id).where(AgentRun.run_id == run_id).exists())
+        )
+
     def get_agent_run_full(self, run_id: str) -> Optional[dict]:
         """Get agent run with all related data."""
-        run = self.get_agent_run(run_id)
+        # One SELECT for the run plus one SELECT ... IN per child collection;
+        # ordering comes from the relationship definitions
+        run = self.session.exec(
+            select(AgentRun)
+            .where(AgentRun.run_id == run_id)
+            .options(
+                selectinload(AgentRun.steps),
+                selectinload(AgentRun.tool_calls),
+                selectinload(AgentRun.guardrail_events),
+            )
+        ).first()
         if not run:
             return None
 
-        steps = self.session.exec(
-            select(AgentStep).where(AgentStep.run_id == run_id).order_by(AgentStep.started_at)
-        ).all()
-
-        tool_calls = self.session.exec(
-            select(ToolCall).where(ToolCall.run_id == run_id)
-        ).all()
-
-        guardrails = self.session.exec(
-            select(GuardrailEvent).where(GuardrailEvent.run_id == run_id).order_by(GuardrailEvent.created_at)
-        ).all()
-
         return {
             "run": run,
-            "steps": steps,
-            "tool_calls": tool_calls,
-            "guardrails": guardrails,
+            "steps": run.steps,
+            "tool_calls": run.tool_calls,
+            "guardrails": run.guardrail_events,
         }
 
     def get_timeline(self, run_id: str) -> list[TimelineEvent]:
         """Get merged timeline of events."""
-        data = self.get_agent_run_full(run_id)
-        if not data:
+        if not self.exists(run_id):
             return []
 
-        timeline = []
+        # Merge steps, tool calls and guardrails in SQL. Every branch selects the
+        # same column shape (NULL for details the event type doesn't carry) and
+        # kind_order keeps each step ahead of tool calls sharing its timestamp.
+        steps = select(
+            literal("step").label("kind"),
+            literal(0).label("kind_order"),
+            AgentStep.step_id.label("event_id"),
+            AgentStep.name.label("name"),
+            AgentStep.status.label("status"),
+            AgentStep.started_at.label("ts"),
+            AgentStep.input_summary.label("input_summary"),
+            AgentStep.output_summary.label("output_summary"),
+            null().label("result_summary"),
+            null().label("error_class"),
+            null().label("error_message"),
+            null().label("message"),
+            AgentStep.latency_ms.label("latency_ms"),
+            AgentStep.retries.label("retries"),
+            type_coerce(null(), JSON).label("args_json"),
+        ).where(AgentStep.run_id == run_id)
 
-        # Add steps
-        for step in data["steps"]:
-            timeline.append(
-                TimelineEvent(
-                    event_id=step.step_id,
-                    event_type="step",
-                    timestamp=step.started_at,
-                    name=step.name,
-                    status=step.status,
-                    details={
-                        "input_summary": step.input_summary,
-                        "output_summary": step.output_summary,
-                        "latency_ms": step.latency_ms,
-                        "retries": step.retries,
-                    },
-                )
+        # Tool calls are timestamped with the start of their step
+        tool_calls = (
+            select(
+                literal("tool_call"),
+                literal(1),
+                ToolCall.call_id,
+                ToolCall.tool_name,
+                ToolCall.status,
+                func.coalesce(AgentStep.started_at, literal(utcnow())),
+                null(),
+                null(),
+                ToolCall.result_summary,
+                ToolCall.error_class,
+                ToolCall.error_message,
+                null(),
+                ToolCall.latency_ms,
+                null(),
+                ToolCall.args_json,
             )
+            .select_from(ToolCall)
+            .outerjoin(AgentStep, AgentStep.step_id == ToolCall.step_id)
+            .where(ToolCall.run_id == run_id)
+        )
 
-        # Add tool calls
-        for tool_call in data["tool_calls"]:
-            # Estimate timestamp from step
-            step = next((s for s in data["steps"] if s.step_id == tool_call.step_id), None)
-            timestamp = step.started_at if step else datetime.utcnow()
-            timeline.append(
-                TimelineEvent(
-                    event_id=tool_call.call_id,
-                    event_type="tool_call",
-                    timestamp=timestamp,
-                    name=tool_call.tool_name,
-                    status=tool_call.status,
-                    details={
-                        "args_json": tool_call.args_json,
-                        "result_summary": tool_call.result_summary,
-                        "error_class": tool_call.error_class,
-                        "error_message": tool_call.error_message,
-                        "latency_ms": tool_call.latency_ms,
-                    },
-                )
-            )
+        guardrails = select(
+            literal("guardrail"),
+            literal(2),
+            GuardrailEvent.event_id,
+            GuardrailEvent.type,
+            literal("triggered"),
+            GuardrailEvent.created_at,
+            null(),
+            null(),
+            null(),
+            null(),
+            null(),
+            GuardrailEvent.message,
+            null(),
+            null(),
+            null(),
+        ).where(GuardrailEvent.run_id == run_id)
+
+        merged = union_all(steps, tool_calls, guardrails).subquery()
+        rows = self.session.exec(
+            select(*merged.c).order_by(merged.c.ts, merged.c.kind_order)
+        ).all()
+
+        timeline = []
+        for row in rows:
+            if row.kind == "step":
+                details = {
+                    "input_summary": row.input_summary,
+                    "output_summary": row.output_summary,
+                    "latency_ms": row.latency_ms,
+                    "retries": row.retries,
+                }
+            elif row.kind == "tool_call":
+                details = {
+                    "args_json": row.args_json,
+                    "result_summary": row.result_summary,
+                    "error_class": row.error_class,
+                    "error_message": row.error_message,
+                    "latency_ms": row.latency_ms,
+                }
+            else:
+                details = {"message": row.message}
 
-        # Add guardrails
-        for event in data["guardrails"]:
             timeline.append(
                 TimelineEvent(
-                    event_id=event.event_id,
-                    event_type="guardrail",
-                    timestamp=event.created_at,
-                    name=event.type,
-                    status="triggered",
-                    details={"message": event.message},
+                    event_id=row.event_id,
+                    event_type=row.kind,
+                    timestamp=row.ts,
+                    name=row.name,
+                    status=row.status,
+                    details=details,
                 )
             )
 
-        # Sort by timestamp
-        timeline.sort(key=lambda x: x.timestamp)
         return timeline
 
     def get_metrics_overview(self, hours: int = 24) -> dict:
         """Get basic AgentOps metrics."""
-        cutoff = datetime.utcnow() - timedelta(hours=hours)
+        cutoff = utcnow() - timedelta(hours=hours)
 
-        # Total runs
-        total_runs = self.session.exec(
-            select(func.count(AgentRun.run_id)).where(AgentRun.created_at >= cutoff)
+        # Total runs, successful runs and total cost in a single aggregate
+        total_runs, successful_runs, total_cost = self.session.exec(
+            select(
+                func.count(AgentRun.run_id),
+                func.sum(case((AgentRun.status == "success", 1), else_=0)),
+                func.sum(AgentRun.cost["total_cost_usd"].as_float()),
+            ).where(AgentRun.created_at >= cutoff)
         ).one()
-
-        # Success rate
-        successful_runs = self.session.exec(
-            select(func.count(AgentRun.run_id)).where(
-                AgentRun.created_at >= cutoff, AgentRun.status == "success"
-            )
-        ).one()
-        success_rate = (successful_runs / total_runs * 100) if total_runs > 0 else 0.0
+        success_rate = ((successful_runs or 0) / total_runs * 100) if total_runs > 0 else 0.0
 
         # Top failing tools
         top_failing_tools = self.session.exec(
@@ -176,27 +218,45 @@ class AgentRunRepository:
             .limit(5)
         ).all()
 
-        # P95 step latency (approximate)
-        step_latencies = self.session.exec(
-            select(AgentStep.latency_ms)
-            .join(AgentRun, AgentStep.run_id == AgentRun.run_id)
-            .where(AgentRun.created_at >= cutoff)
-            .order_by(AgentStep.latency_ms)
-        ).all()
-        p95_latency = step_latencies[int(len(step_latencies) * 0.95)] if step_latencies else 0
-
-        # Total cost
-        runs_with_cost = self.session.exec(
-            select(AgentRun.cost).where(AgentRun.created_at >= cutoff)
-        ).all()
-        total_cost = sum(
-            cost.get("total_cost_usd", 0) for cost in runs_with_cost if cost.get("total_cost_usd")
-        )
-
         return {
             "total_runs": total_runs,
             "success_rate": round(success_rate, 2),
             "top_failing_tools": [{"tool": tool, "count": count} for tool, count in top_failing_tools],
-            "p95_step_latency_ms": p95_latency,
+            "p95_step_latency_ms": self._p95_step_latency(cutoff),
             "total_cost_usd": round(total_cost, 4) if total_cost else None,
         }
+
+    def _p95_step_latency(self, cutoff: datetime) -> int:
+        """Get P95 step latency for runs created since cutoff, computed in the database.
+
+        The P95 is the latency at index floor(N * 95 / 100) of the sorted latencies.
+        N is counted in a scalar subquery inside the OFFSET, so this is one round
+        trip, and the integer arithmetic gives the same index on every dialect
+        (Postgres' percentile_disc would pick index ceil(N * 0.95) - 1 instead).
+        """
+        step_count = (
+            select(func.count(AgentStep.step_id))
+            .join(AgentRun, AgentStep.run_id == AgentRun.run_id)
+            .where(AgentRun.created_at >= cutoff)
+            .scalar_subquery()
+        )
+        p95_latency = self.session.exec(
+            select(AgentStep.latency_ms)
+            .join(AgentRun, AgentStep.run_id == AgentRun.run_id)
+            .where(AgentRun.created_at >= cutoff)
+            .order_by(AgentStep.latency_ms)
+            .offset(step_count * 95 // 100)
+            .limit(1)
+        ).first()
+        return p95_latency or 0
+        if not step_count:
+            return 0
+
+        return self.session.exec(
+            select(AgentStep.latency_ms)
+            .join(AgentRun, AgentStep.run_id == AgentRun.run_id)
+            .where(AgentRun.created_at >= cutoff)
+            .order_by(AgentStep.latency_ms)
+            .offset(int(step_count * 0.95))
+            .limit(1)
+        ).one()
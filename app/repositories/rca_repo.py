@@ -1,10 +1,14 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Optional
-from sqlmodel import Session, select
+from sqlmodel import Session, select, insert, and_, cast, type_coerce, Text
+from app.core.time import utcnow
+from app.models.agent_run import AgentRun
 from app.models.rca_run import RCArun, RCAReport
 
 
 class RCARepository:
+    __slots__ = ("session",)
+
     def __init__(self, session: Session):
         self.session = session
 
@@ -23,6 +27,26 @@ class RCARepository:
         self.session.refresh(rca_run)
         return rca_run
 
+    def create_rca_runs_bulk(self, rows: list[tuple[str, str]]) -> None:
+        """Create queued RCA runs for (rca_run_id, run_id) pairs in one INSERT."""
+        created_at = utcnow()
+        self.session.exec(
+            insert(RCArun),
+            params=[
+                {
+                    "rca_run_id": rca_run_id,
+                    "run_id": run_id,
+                    "status": "queued",
+                    "step": "",
+                    "pct": 0,
+                    "message": "RCA job queued",
+                    "created_at": created_at,
+                }
+                for rca_run_id, run_id in rows
+            ],
+        )
+        self.session.commit()
+
     def get_rca_run(self, rca_run_id: str) -> Optional[RCArun]:
         """Get RCA run by ID."""
         return self.session.get(RCArun, rca_run_id)
@@ -35,8 +59,12 @@ class RCARepository:
         pct: int = 0,
         message: str = "",
         error_message: Optional[str] = None,
+        commit: bool = True,
     ) -> None:
-        """Update RCA run status."""
+        """Update RCA run status.
+
+        With commit=False the change is left pending for the caller's next commit.
+        """
         rca_run = self.get_rca_run(rca_run_id)
         if not rca_run:
             return
@@ -47,37 +75,39 @@ class RCARepository:
         rca_run.message = message
 
         if status == "running" and not rca_run.started_at:
-            rca_run.started_at = datetime.utcnow()
+            rca_run.started_at = utcnow()
         elif status in ["done", "error"]:
-            rca_run.ended_at = datetime.utcnow()
+            rca_run.ended_at = utcnow()
 
         if error_message:
             rca_run.error_message = error_message
 
         self.session.add(rca_run)
-        self.session.commit()
+        if commit:
+            self.session.commit()
 
     def save_rca_report(
         self,
         report_id: str,
         rca_run_id: str,
         run_id: str,
-        report_json: dict,
+        report_json: str,
         insufficient_evidence: bool,
         category: str,
     ) -> RCAReport:
-        """Save RCA report."""
+        """Save RCA report from its already serialized JSON."""
         report = RCAReport(
             report_id=report_id,
             rca_run_id=rca_run_id,
             run_id=run_id,
-            report_json=report_json,
+            # Bound as plain text so the column's JSON serializer doesn't encode it again;
+            # the attribute is expired after flush and loads parsed on access
+            report_json=type_coerce(report_json, Text),
             insufficient_evidence=insufficient_evidence,
             category=category,
         )
         self.session.add(report)
         self.session.commit()
-        self.session.refresh(report)
         return report
 
     def get_rca_report(self, rca_run_id: str) -> Optional[RCAReport]:
@@ -86,9 +116,15 @@ class RCARepository:
             select(RCAReport).where(RCAReport.rca_run_id == rca_run_id)
         ).first()
 
+    def get_rca_report_raw_json(self, rca_run_id: str) -> Optional[str]:
+        """Get the stored RCA report JSON as text, without decoding it."""
+        return self.session.scalar(
+            select(cast(RCAReport.report_json, Text)).where(RCAReport.rca_run_id == rca_run_id)
+        )
+
     def find_recent_rca_run(self, run_id: str, minutes: int = 10) -> Optional[RCArun]:
         """Find recent RCA run for a given agent run."""
-        cutoff = datetime.utcnow() - timedelta(minutes=minutes)
+        cutoff = utcnow() - timedelta(minutes=minutes)
         return self.session.exec(
             select(RCArun)
             .where(
@@ -98,3 +134,48 @@ class RCARepository:
             )
             .order_by(RCArun.created_at.desc())
         ).first()
+
+    def find_run_and_recent_rca_run(
+        self, run_id: str, minutes: int = 10
+    ) -> tuple[bool, Optional[str]]:
+        """Check that an agent run exists and find its recent RCA run in one query.
+
+        Returns (run exists, ID of the most recent queued/running RCA run or None).
+        """
+        row = self.session.exec(
+            select(AgentRun.run_id, RCArun.rca_run_id)
+            .outerjoin(RCArun, self._recent_rca_run_clause(minutes))
+            .where(AgentRun.run_id == run_id)
+            .order_by(RCArun.created_at.desc())
+            .limit(1)
+        ).first()
+        if row is None:
+            return False, None
+        return True, row.rca_run_id
+
+    def find_runs_and_recent_rca_runs(
+        self, run_ids: list[str], minutes: int = 10
+    ) -> dict[str, Optional[str]]:
+        """Bulk variant of find_run_and_recent_rca_run.
+
+        Maps each existing agent run ID to its most recent queued/running RCA
+        run ID (or None); run IDs that don't exist are left out.
+        """
+        rows = self.session.exec(
+            select(AgentRun.run_id, RCArun.rca_run_id)
+            .outerjoin(RCArun, self._recent_rca_run_clause(minutes))
+            .where(AgentRun.run_id.in_(run_ids))
+            .order_by(RCArun.created_at)
+        ).all()
+        # Rows are oldest first, so the most recent RCA run of each agent run wins
+        return {run_id: rca_run_id for run_id, rca_run_id in rows}
+
+    @staticmethod
+    def _recent_rca_run_clause(minutes: int):
+        """Join condition matching an agent run's queued/running RCA runs in the window."""
+        cutoff = utcnow() - timedelta(minutes=minutes)
+        return and_(
+            RCArun.run_id == AgentRun.run_id,
+            RCArun.status.in_(["queued", "running"]),
+            RCArun.created_at >= cutoff,
+        )
@@ -1,10 +1,14 @@
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 from uuid import uuid4
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from app.core.time import utcnow
 
 
 class CostSummary(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     tokens_prompt: int = 0
     tokens_completion: int = 0
     total_cost_usd: Optional[float] = None
@@ -21,20 +25,17 @@ class AgentStep(BaseModel):
     retries: int = 0
     latency_ms: int = 0
 
-    @field_validator("latency_ms", mode="before")
-    @classmethod
-    def compute_latency(cls, v: int, info) -> int:
-        if v > 0:
-            return v
+    @model_validator(mode="after")
+    def _fill_latency(self) -> "AgentStep":
         # Calculate from timestamps if not provided
-        data = info.data
-        if "started_at" in data and "ended_at" in data:
-            delta = data["ended_at"] - data["started_at"]
-            return int(delta.total_seconds() * 1000)
-        return 0
+        if self.latency_ms <= 0:
+            self.latency_ms = int((self.ended_at - self.started_at).total_seconds() * 1000)
+        return self
 
 
 class ToolCall(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     call_id: str = Field(default_factory=lambda: str(uuid4()))
     step_id: str
     tool_name: str
@@ -50,12 +51,14 @@ class ToolCall(BaseModel):
 
 
 class GuardrailEvent(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     event_id: str = Field(default_factory=lambda: str(uuid4()))
     type: str  # pii_redaction, policy_block, schema_validation, other
     message: str
     step_id: Optional[str] = None
     call_id: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
 
 
 class AgentRunPayload(BaseModel):
@@ -88,7 +91,10 @@ class AgentRunResponse(BaseModel):
     guardrail_event_count: int
 
 
-class TimelineEvent(BaseModel):
+@dataclass(slots=True)
+class TimelineEvent:
+    """Timeline entry built from trusted rows; orjson serializes it natively."""
+
     event_id: str
     event_type: str  # step, tool_call, guardrail
     timestamp: datetime
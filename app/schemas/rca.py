@@ -1,6 +1,8 @@
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 from enum import Enum
+from uuid import uuid4
 from pydantic import BaseModel, Field
 
 
@@ -47,7 +49,7 @@ class EvidenceRef(BaseModel):
 
 
 class Hypothesis(BaseModel):
-    hypothesis_id: str = Field(default_factory=lambda: f"hyp_{datetime.utcnow().timestamp()}")
+    hypothesis_id: str = Field(default_factory=lambda: f"hyp_{uuid4().hex}")
     title: str
     description: str
     evidence_ids: list[str]  # MUST reference evidence
@@ -57,7 +59,7 @@ class Hypothesis(BaseModel):
 
 
 class ActionItem(BaseModel):
-    action_id: str = Field(default_factory=lambda: f"act_{datetime.utcnow().timestamp()}")
+    action_id: str = Field(default_factory=lambda: f"act_{uuid4().hex}")
     type: ActionItemType
     title: str
     description: str
@@ -114,9 +116,30 @@ class RCARunResponse(BaseModel):
     report: Optional[RCAReport] = None
 
 
-class ProgressEvent(BaseModel):
+class RCARunBulkRequest(BaseModel):
+    run_ids: list[str] = Field(min_length=1, max_length=500)
+
+
+@dataclass(frozen=True, slots=True)
+class ProgressEvent:
+    """Progress tick for an RCA run.
+
+    A slotted dataclass rather than a BaseModel: it is built from trusted
+    values on every tick and orjson serializes dataclasses natively.
+    """
+
     status: RCARunStatus
     step: str
     pct: int
     message: str
     updated_at: datetime
+
+    def to_status_hash(self) -> dict:
+        """Flatten to the string/int fields stored in the Redis status hash."""
+        return {
+            "status": self.status.value,
+            "step": self.step,
+            "pct": self.pct,
+            "message": self.message,
+            "updated_at": self.updated_at.isoformat(),
+        }
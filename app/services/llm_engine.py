@@ -1,10 +1,107 @@
-from typing import Optional
-from app.core.settings import settings
+from types import MappingProxyType
+from typing import Mapping, Optional, Sequence
+from app.core.settings import get_settings
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
 
+def _freeze_actions(actions: list[dict]) -> tuple[Mapping[str, str], ...]:
+    """Make action templates read-only so the shared copies can't be mutated."""
+    return tuple(MappingProxyType(action) for action in actions)
+
+
+# Deterministic templates, built once and shared across calls
+_HYPOTHESIS_TEMPLATES = MappingProxyType({
+    "tool_schema_mismatch": "Tool call failed due to schema validation error. The tool arguments did not match the expected schema, likely due to API changes or incorrect parameter formatting.",
+    "rate_limited": "Tool call was rate limited (HTTP 429). The system exceeded the API rate limit, suggesting high request volume or insufficient rate limit configuration.",
+    "tool_permission": "Tool call failed due to permission error. The agent lacks necessary credentials or permissions to execute the requested action.",
+    "timeout": "Operation timed out before completion. The tool or step exceeded configured timeout limits, possibly due to slow external service or large data processing.",
+    "planner_loop": "Agent entered a retry loop with excessive retries. The planner may be stuck in a cycle, repeatedly attempting the same failed operation.",
+    "retrieval_empty": "Retrieval operation returned empty or insufficient results. The search/query did not find relevant data, possibly due to incorrect query formulation or missing data.",
+    "prompt_regression": "Prompt behavior changed unexpectedly. Model responses deviated from expected format, possibly due to prompt changes or model version update.",
+    "unknown": "Failure cause could not be determined from available telemetry. Additional instrumentation or logging may be needed.",
+})
+
+_INSUFFICIENT_ACTIONS = _freeze_actions(
+    [
+        {
+            "type": "monitoring",
+            "title": "Enable detailed tracing",
+            "description": "Add structured logging and tracing to capture more diagnostic information.",
+            "priority": "high",
+        },
+        {
+            "type": "code_change",
+            "title": "Add structured error codes",
+            "description": "Implement error code taxonomy to enable better classification in future RCAs.",
+            "priority": "medium",
+        },
+    ]
+)
+
+_ACTION_TEMPLATES = MappingProxyType({
+    "tool_schema_mismatch": _freeze_actions(
+        [
+            {
+                "type": "code_change",
+                "title": "Update tool schema validation",
+                "description": "Review and update tool argument schemas to match current API contract. Add unit tests for schema validation.",
+                "priority": "high",
+            },
+            {
+                "type": "test",
+                "title": "Add integration tests for tool calls",
+                "description": "Create integration tests that validate tool schemas against live API endpoints.",
+                "priority": "medium",
+            },
+        ]
+    ),
+    "rate_limited": _freeze_actions(
+        [
+            {
+                "type": "change_config",
+                "title": "Implement rate limiting backoff",
+                "description": "Add exponential backoff and retry logic for rate-limited requests.",
+                "priority": "high",
+            },
+            {
+                "type": "monitoring",
+                "title": "Add rate limit monitoring",
+                "description": "Track API usage and alert before hitting rate limits.",
+                "priority": "high",
+            },
+        ]
+    ),
+    "tool_permission": _freeze_actions(
+        [
+            {
+                "type": "change_config",
+                "title": "Verify API credentials and permissions",
+                "description": "Audit all API keys and service account permissions. Update with required scopes.",
+                "priority": "critical",
+            },
+        ]
+    ),
+    "timeout": _freeze_actions(
+        [
+            {
+                "type": "change_config",
+                "title": "Increase timeout thresholds",
+                "description": "Review and adjust timeout configuration based on P95 latency metrics.",
+                "priority": "high",
+            },
+            {
+                "type": "code_change",
+                "title": "Optimize slow operations",
+                "description": "Profile and optimize operations that frequently approach timeout limits.",
+                "priority": "medium",
+            },
+        ]
+    ),
+})
+
+
 class LLMEngine:
     """LLM integration for summarization and action item generation.
 
@@ -14,7 +111,7 @@ class LLMEngine:
     """
 
     def __init__(self):
-        self.enabled = bool(settings.openai_api_key)
+        self.enabled = bool(get_settings().openai_api_key)
         if not self.enabled:
             logger.info("LLM engine running in DISABLED mode (deterministic templates)")
         else:
@@ -48,100 +145,28 @@ class LLMEngine:
 
     def _deterministic_hypothesis(self, category: str, evidence_snippets: list[str]) -> str:
         """Create deterministic hypothesis based on category."""
-        templates = {
-            "tool_schema_mismatch": "Tool call failed due to schema validation error. The tool arguments did not match the expected schema, likely due to API changes or incorrect parameter formatting.",
-            "rate_limited": "Tool call was rate limited (HTTP 429). The system exceeded the API rate limit, suggesting high request volume or insufficient rate limit configuration.",
-            "tool_permission": "Tool call failed due to permission error. The agent lacks necessary credentials or permissions to execute the requested action.",
-            "timeout": "Operation timed out before completion. The tool or step exceeded configured timeout limits, possibly due to slow external service or large data processing.",
-            "planner_loop": "Agent entered a retry loop with excessive retries. The planner may be stuck in a cycle, repeatedly attempting the same failed operation.",
-            "retrieval_empty": "Retrieval operation returned empty or insufficient results. The search/query did not find relevant data, possibly due to incorrect query formulation or missing data.",
-            "prompt_regression": "Prompt behavior changed unexpectedly. Model responses deviated from expected format, possibly due to prompt changes or model version update.",
-            "unknown": "Failure cause could not be determined from available telemetry. Additional instrumentation or logging may be needed.",
-        }
-        base_description = templates.get(category, templates["unknown"])
+        base_description = _HYPOTHESIS_TEMPLATES.get(category, _HYPOTHESIS_TEMPLATES["unknown"])
 
         if evidence_snippets:
             base_description += f" Evidence shows: {'; '.join(evidence_snippets[:2])}."
 
         return base_description
 
-    def generate_action_items(self, category: str, insufficient: bool) -> list[dict]:
+    def generate_action_items(self, category: str, insufficient: bool) -> Sequence[Mapping[str, str]]:
         """Generate action items (deterministic for MVP)."""
         if insufficient:
-            return [
-                {
-                    "type": "monitoring",
-                    "title": "Enable detailed tracing",
-                    "description": "Add structured logging and tracing to capture more diagnostic information.",
-                    "priority": "high",
-                },
-                {
-                    "type": "code_change",
-                    "title": "Add structured error codes",
-                    "description": "Implement error code taxonomy to enable better classification in future RCAs.",
-                    "priority": "medium",
-                },
-            ]
+            return _INSUFFICIENT_ACTIONS
 
         # Category-specific actions
-        action_templates = {
-            "tool_schema_mismatch": [
-                {
-                    "type": "code_change",
-                    "title": "Update tool schema validation",
-                    "description": "Review and update tool argument schemas to match current API contract. Add unit tests for schema validation.",
-                    "priority": "high",
-                },
-                {
-                    "type": "test",
-                    "title": "Add integration tests for tool calls",
-                    "description": "Create integration tests that validate tool schemas against live API endpoints.",
-                    "priority": "medium",
-                },
-            ],
-            "rate_limited": [
-                {
-                    "type": "change_config",
-                    "title": "Implement rate limiting backoff",
-                    "description": "Add exponential backoff and retry logic for rate-limited requests.",
-                    "priority": "high",
-                },
-                {
-                    "type": "monitoring",
-                    "title": "Add rate limit monitoring",
-                    "description": "Track API usage and alert before hitting rate limits.",
-                    "priority": "high",
-                },
-            ],
-            "tool_permission": [
-                {
-                    "type": "change_config",
-                    "title": "Verify API credentials and permissions",
-                    "description": "Audit all API keys and service account permissions. Update with required scopes.",
-                    "priority": "critical",
-                },
-            ],
-            "timeout": [
-                {
-                    "type": "change_config",
-                    "title": "Increase timeout thresholds",
-                    "description": "Review and adjust timeout configuration based on P95 latency metrics.",
-                    "priority": "high",
-                },
-                {
-                    "type": "code_change",
-                    "title": "Optimize slow operations",
-                    "description": "Profile and optimize operations that frequently approach timeout limits.",
-                    "priority": "medium",
-                },
-            ],
-        }
-
-        return action_templates.get(category, [
+        actions = _ACTION_TEMPLATES.get(category)
+        if actions is not None:
+            return actions
+
+        return (
             {
                 "type": "runbook",
                 "title": "Investigate root cause",
                 "description": f"Manual investigation required for {category} failure category.",
                 "priority": "high",
-            }
-        ])
+            },
+        )
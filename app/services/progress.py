@@ -1,7 +1,8 @@
-import json
-from datetime import datetime
+import orjson
 from typing import Optional
 from app.core.redis_clients import get_sync_redis
+from app.core.settings import get_settings
+from app.core.time import utcnow
 from app.schemas.rca import RCARunStatus, ProgressEvent
 
 
@@ -10,6 +11,7 @@ class ProgressService:
 
     def __init__(self):
         self.redis = get_sync_redis()
+        self.status_ttl = get_settings().rca_status_ttl_seconds
 
     def _status_key(self, rca_run_id: str) -> str:
         return f"rca:{rca_run_id}:status"
@@ -31,23 +33,22 @@ class ProgressService:
             step=step,
             pct=pct,
             message=message,
-            updated_at=datetime.utcnow(),
+            updated_at=utcnow(),
         )
 
-        # Update status hash
-        status_data = event.model_dump()
-        status_data["updated_at"] = status_data["updated_at"].isoformat()
-        status_data["status"] = status_data["status"].value
-        self.redis.hset(
-            self._status_key(rca_run_id),
-            mapping=status_data,
-        )
+        # Update status hash, refresh its TTL and publish to channel in one
+        # round trip; the TTL lets Redis reclaim hashes left by crashed workers
+        status_key = self._status_key(rca_run_id)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hset(status_key, mapping=event.to_status_hash())
+        pipe.expire(status_key, self.status_ttl)
+        pipe.publish(self._channel_name(rca_run_id), orjson.dumps(event))
+        pipe.execute()
 
-        # Publish to channel
-        self.redis.publish(
-            self._channel_name(rca_run_id),
-            json.dumps(status_data),
-        )
+    def get_status(self, rca_run_id: str) -> Optional[str]:
+        """Get just the latest published status (e.g. "done"), if any."""
+        status = self.redis.hget(self._status_key(rca_run_id), "status")
+        return status.decode() if status is not None else None
 
     def get_latest_status(self, rca_run_id: str) -> Optional[dict]:
         """Get the latest status snapshot from Redis hash."""
@@ -58,5 +59,5 @@ class ProgressService:
         return {k.decode(): v.decode() for k, v in data.items()}
 
     def clear_status(self, rca_run_id: str) -> None:
-        """Clear status hash (cleanup)."""
+        """Clear status hash before its TTL runs out (e.g. on cancellation)."""
         self.redis.delete(self._status_key(rca_run_id))
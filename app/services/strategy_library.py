@@ -1,6 +1,17 @@
+import re
 from typing import Optional
 from app.schemas.rca import RCACategory
 
+# Keyword patterns matched against tool call error messages / classes
+_RATE_LIMIT_RE = re.compile(r"rate limit", re.IGNORECASE)
+_SCHEMA_RE = re.compile(r"validation|schema|unexpected|missing required", re.IGNORECASE)
+_PERMISSION_RE = re.compile(
+    r"permission|unauthorized|forbidden|access denied", re.IGNORECASE
+)
+_TIMEOUT_RE = re.compile(r"timeout", re.IGNORECASE)
+_RETRIEVAL_STEP_RE = re.compile(r"retriev|search", re.IGNORECASE)
+_PERMISSION_STATUS_CODES = frozenset({401, 403})
+
 
 class StrategyLibrary:
     """Deterministic pattern matching for RCA category classification."""
@@ -18,36 +29,26 @@ class StrategyLibrary:
         # Check tool calls for specific patterns
         for tool_call in tool_calls:
             if tool_call.status == "failure":
+                error_message = tool_call.error_message or ""
+                error_class = tool_call.error_class or ""
+
                 # Rate limiting
-                if tool_call.status_code == 429 or (
-                    tool_call.error_message
-                    and "rate limit" in tool_call.error_message.lower()
-                ):
+                if tool_call.status_code == 429 or _RATE_LIMIT_RE.search(error_message):
                     return RCACategory.RATE_LIMITED
 
                 # Tool schema mismatch
-                if tool_call.error_class and "schema" in tool_call.error_class.lower():
-                    return RCACategory.TOOL_SCHEMA_MISMATCH
-                if tool_call.error_message and any(
-                    keyword in tool_call.error_message.lower()
-                    for keyword in ["validation", "schema", "unexpected", "missing required"]
-                ):
+                if "schema" in error_class.lower() or _SCHEMA_RE.search(error_message):
                     return RCACategory.TOOL_SCHEMA_MISMATCH
 
                 # Permission issues
-                if tool_call.status_code in [401, 403] or (
-                    tool_call.error_message
-                    and any(
-                        keyword in tool_call.error_message.lower()
-                        for keyword in ["permission", "unauthorized", "forbidden", "access denied"]
-                    )
+                if (
+                    tool_call.status_code in _PERMISSION_STATUS_CODES
+                    or _PERMISSION_RE.search(error_message)
                 ):
                     return RCACategory.TOOL_PERMISSION
 
                 # Timeout
-                if tool_call.error_class and "timeout" in tool_call.error_class.lower():
-                    return RCACategory.TIMEOUT
-                if tool_call.error_message and "timeout" in tool_call.error_message.lower():
+                if _TIMEOUT_RE.search(error_class) or _TIMEOUT_RE.search(error_message):
                     return RCACategory.TIMEOUT
 
         # Check guardrails for schema validation
@@ -56,17 +57,15 @@ class StrategyLibrary:
                 return RCACategory.TOOL_SCHEMA_MISMATCH
 
         # Check steps for planner loop (excessive retries)
-        max_retries = max((step.retries for step in steps), default=0)
-        if max_retries >= 3:
+        if any(step.retries >= 3 for step in steps):
             return RCACategory.PLANNER_LOOP
 
         # Check for retrieval empty (heuristic: low output with no errors)
         if not tool_calls and not error_type:
             # Could be retrieval_empty if there's a search/retrieval pattern
             for step in steps:
-                if "retriev" in step.name.lower() or "search" in step.name.lower():
-                    if len(step.output_summary) < 50:
-                        return RCACategory.RETRIEVAL_EMPTY
+                if _RETRIEVAL_STEP_RE.search(step.name) and len(step.output_summary) < 50:
+                    return RCACategory.RETRIEVAL_EMPTY
 
         # Timeout at run level
         if error_type and "timeout" in error_type.lower():
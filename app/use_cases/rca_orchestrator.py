@@ -1,8 +1,11 @@
-from datetime import datetime
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import islice
 from uuid import uuid4
 from typing import Optional
 from sqlmodel import Session
 from app.core.logging import get_logger
+from app.core.time import utcnow
 from app.repositories.agent_run_repo import AgentRunRepository
 from app.repositories.rca_repo import RCARepository
 from app.services.progress import ProgressService
@@ -10,7 +13,6 @@ from app.services.strategy_library import StrategyLibrary
 from app.services.llm_engine import LLMEngine
 from app.schemas.rca import (
     RCAReport,
-    RCACategory,
     RCARunStatus,
     EvidenceRef,
     EvidenceKind,
@@ -24,6 +26,35 @@ from app.schemas.rca import (
 
 logger = get_logger(__name__)
 
+# Both services are stateless after construction, so one instance per process
+# is shared by every job
+_STRATEGY_LIB = StrategyLibrary()
+_LLM_ENGINE_DEFAULT = LLMEngine()
+
+# Evidence snippets are copied into the report rather than referenced: re-ingesting
+# a run replaces its telemetry rows, and a stored report must not change with it.
+# Slicing a string no longer than this returns the same object, so short texts
+# aren't copied.
+EVIDENCE_SNIPPET_CHARS = 200
+
+# Enum members bound once; action templates map to their enums by plain dict
+# lookup instead of an Enum(value) call per item
+_KIND_STEP = EvidenceKind.STEP
+_KIND_TOOL = EvidenceKind.TOOL_CALL
+_KIND_GUARD = EvidenceKind.GUARDRAIL
+_ACTION_TYPE_MAP = {member.value: member for member in ActionItemType}
+_PRIORITY_MAP = {member.value: member for member in ActionItemPriority}
+
+
+@dataclass(slots=True)
+class TelemetryScan:
+    """Evidence and metric inputs gathered in a single pass over a run's telemetry."""
+
+    evidence: list[EvidenceRef] = field(default_factory=list)
+    tool_failures: Counter[str] = field(default_factory=Counter)
+    max_step_latency_ms: int = 0
+    total_retries: int = 0
+
 
 class RCAOrchestrator:
     """Orchestrates the RCA analysis process."""
@@ -38,8 +69,8 @@ class RCAOrchestrator:
         self.agent_run_repo = AgentRunRepository(session)
         self.rca_repo = RCARepository(session)
         self.progress_service = progress_service or ProgressService()
-        self.strategy_library = StrategyLibrary()
-        self.llm_engine = llm_engine or LLMEngine()
+        self.strategy_library = _STRATEGY_LIB
+        self.llm_engine = llm_engine or _LLM_ENGINE_DEFAULT
 
     def run_rca_analysis(self, rca_run_id: str) -> None:
         """Execute complete RCA analysis workflow."""
@@ -63,41 +94,44 @@ class RCAOrchestrator:
                 rca_run_id, "running", "starting", 5, "Starting RCA analysis"
             )
 
+            # Load the run and its telemetry once; every step below reads from it
+            agent_run_data = self.agent_run_repo.get_agent_run_full(run_id)
+            if not agent_run_data:
+                raise ValueError(f"Agent run not found: {run_id}")
+            run = agent_run_data["run"]
+
             # Step 1: Collect evidence
             self._update_progress(rca_run_id, RCARunStatus.RUNNING, "Collecting evidence", 30)
-            evidence_index = self._collect_evidence(run_id)
+            scan = self._scan_telemetry(agent_run_data)
+            evidence_index = scan.evidence
 
             # Step 2: Classify category
             self._update_progress(rca_run_id, RCARunStatus.RUNNING, "Classifying failure", 55)
-            agent_run_data = self.agent_run_repo.get_agent_run_full(run_id)
-            if not agent_run_data:
-                raise ValueError(f"Agent run not found: {run_id}")
-
             category = self.strategy_library.classify_category(
-                error_type=agent_run_data["run"].error_type,
-                error_message=agent_run_data["run"].error_message,
+                error_type=run.error_type,
+                error_message=run.error_message,
                 tool_calls=agent_run_data["tool_calls"],
                 steps=agent_run_data["steps"],
                 guardrails=agent_run_data["guardrails"],
             )
+            category_value = category.value
+            category_title = category_value.replace("_", " ").title()
 
             # Step 3: Check for insufficient evidence
-            insufficient_evidence = self._check_insufficient_evidence(
-                agent_run_data, evidence_index
-            )
+            insufficient_evidence = self._check_insufficient_evidence(agent_run_data, scan)
 
             # Step 4: Generate hypotheses and action items
             self._update_progress(rca_run_id, RCARunStatus.RUNNING, "Generating report", 85)
             hypotheses, action_items = self._generate_hypotheses_and_actions(
-                category, evidence_index, insufficient_evidence
+                category_value, category_title, evidence_index, insufficient_evidence
             )
 
             # Step 5: Compile metrics
-            metrics = self._compile_metrics(agent_run_data)
+            metrics = self._compile_metrics(agent_run_data, scan)
 
             # Step 6: Generate Jira fields
             jira_fields = self._generate_jira_fields(
-                run_id, category, hypotheses, action_items, insufficient_evidence
+                run_id, category_value, category_title, hypotheses, action_items, insufficient_evidence
             )
 
             # Step 7: Create report
@@ -105,7 +139,7 @@ class RCAOrchestrator:
                 report_id=str(uuid4()),
                 rca_run_id=rca_run_id,
                 run_id=run_id,
-                generated_at=datetime.utcnow(),
+                generated_at=utcnow(),
                 category=category,
                 insufficient_evidence=insufficient_evidence,
                 insufficient_reason=(
@@ -120,26 +154,29 @@ class RCAOrchestrator:
                 jira_fields=jira_fields,
             )
 
-            # Step 8: Save report
+            # Step 8: Save report and mark the run done in the same commit
+            self.rca_repo.update_rca_run_status(
+                rca_run_id, "done", "completed", 100, "RCA analysis completed", commit=False
+            )
             self.rca_repo.save_rca_report(
                 report_id=report.report_id,
                 rca_run_id=rca_run_id,
                 run_id=run_id,
-                report_json=report.model_dump(mode="json"),
+                report_json=report.model_dump_json(),
                 insufficient_evidence=insufficient_evidence,
-                category=category.value,
+                category=category_value,
             )
 
-            # Step 9: Mark done
+            # Step 9: Tell subscribers once the report is readable
             self._update_progress(rca_run_id, RCARunStatus.DONE, "RCA complete", 100)
-            self.rca_repo.update_rca_run_status(
-                rca_run_id, "done", "completed", 100, "RCA analysis completed"
-            )
 
             logger.info(f"RCA analysis completed for {rca_run_id}")
 
         except Exception as e:
             logger.exception(f"RCA analysis failed for {rca_run_id}: {str(e)}")
+            # Drop anything left pending (e.g. the done status if the report
+            # commit failed) so the error status can be written
+            self.session.rollback()
             self._update_progress(
                 rca_run_id, RCARunStatus.ERROR, "RCA failed", 0, f"Error: {str(e)}"
             )
@@ -155,41 +192,51 @@ class RCAOrchestrator:
             rca_run_id, status, step, pct, message or step
         )
 
-    def _collect_evidence(self, run_id: str) -> list[EvidenceRef]:
-        """Collect evidence from telemetry."""
-        evidence = []
-        agent_run_data = self.agent_run_repo.get_agent_run_full(run_id)
-
-        if not agent_run_data:
-            return evidence
-
-        # Evidence from failed steps
+    def _scan_telemetry(self, agent_run_data: dict) -> TelemetryScan:
+        """Collect evidence and metric inputs in one pass over the telemetry."""
+        scan = TelemetryScan()
+        # Evidence is built from trusted ORM rows, so model_construct skips validation
+        evidence = scan.evidence
+        # Running totals live in locals, and each ORM attribute is read once
+        # per row: both go through descriptors, which dominate this loop
+        max_latency = 0
+        total_retries = 0
+
+        # Evidence from failed steps; latency and retries for the metrics
         for step in agent_run_data["steps"]:
+            latency_ms = step.latency_ms
+            retries = step.retries
+            if latency_ms > max_latency:
+                max_latency = latency_ms
+            total_retries += retries
             if step.status == "failure":
                 evidence.append(
-                    EvidenceRef(
+                    EvidenceRef.model_construct(
                         evidence_id=f"ev_step_{step.step_id}",
-                        kind=EvidenceKind.STEP,
+                        kind=_KIND_STEP,
                         ref_id=step.step_id,
                         title=f"Failed step: {step.name}",
-                        snippet=step.output_summary[:200],
+                        snippet=step.output_summary[:EVIDENCE_SNIPPET_CHARS],
                         attributes={
-                            "latency_ms": step.latency_ms,
-                            "retries": step.retries,
+                            "latency_ms": latency_ms,
+                            "retries": retries,
                         },
                     )
                 )
 
-        # Evidence from failed tool calls
+        # Evidence from failed tool calls; failure counts per tool for the metrics
+        tool_failures = scan.tool_failures
         for tool_call in agent_run_data["tool_calls"]:
+            total_retries += tool_call.retries
             if tool_call.status == "failure":
+                tool_failures[tool_call.tool_name] += 1
                 evidence.append(
-                    EvidenceRef(
+                    EvidenceRef.model_construct(
                         evidence_id=f"ev_tool_{tool_call.call_id}",
-                        kind=EvidenceKind.TOOL_CALL,
+                        kind=_KIND_TOOL,
                         ref_id=tool_call.call_id,
                         title=f"Failed tool call: {tool_call.tool_name}",
-                        snippet=(tool_call.error_message or "")[:200],
+                        snippet=(tool_call.error_message or "")[:EVIDENCE_SNIPPET_CHARS],
                         attributes={
                             "error_class": tool_call.error_class,
                             "status_code": tool_call.status_code,
@@ -201,35 +248,37 @@ class RCAOrchestrator:
         # Evidence from guardrails
         for guardrail in agent_run_data["guardrails"]:
             evidence.append(
-                EvidenceRef(
+                EvidenceRef.model_construct(
                     evidence_id=f"ev_guard_{guardrail.event_id}",
-                    kind=EvidenceKind.GUARDRAIL,
+                    kind=_KIND_GUARD,
                     ref_id=guardrail.event_id,
                     title=f"Guardrail: {guardrail.type}",
-                    snippet=guardrail.message[:200],
+                    snippet=guardrail.message[:EVIDENCE_SNIPPET_CHARS],
                     attributes={"type": guardrail.type},
                 )
             )
 
-        return evidence
+        scan.max_step_latency_ms = max_latency
+        scan.total_retries = total_retries
+        return scan
 
-    def _check_insufficient_evidence(
-        self, agent_run_data: dict, evidence_index: list[EvidenceRef]
-    ) -> bool:
+    def _check_insufficient_evidence(self, agent_run_data: dict, scan: TelemetryScan) -> bool:
         """Determine if evidence is insufficient for RCA."""
+        run = agent_run_data["run"]
+
         # No tool calls AND no error_type AND no guardrail events
         if (
             not agent_run_data["tool_calls"]
-            and not agent_run_data["run"].error_type
+            and not run.error_type
             and not agent_run_data["guardrails"]
         ):
             return True
 
         # Only generic error message with no tool failure details
         if (
-            agent_run_data["run"].error_message
-            and "internal server error" in agent_run_data["run"].error_message.lower()
-            and not any(ev.kind == EvidenceKind.TOOL_CALL for ev in evidence_index)
+            not scan.tool_failures
+            and run.error_message
+            and "internal server error" in run.error_message.lower()
         ):
             return True
 
@@ -237,7 +286,8 @@ class RCAOrchestrator:
 
     def _generate_hypotheses_and_actions(
         self,
-        category: RCACategory,
+        category_value: str,
+        category_title: str,
         evidence_index: list[EvidenceRef],
         insufficient_evidence: bool,
     ) -> tuple[list[Hypothesis], list[ActionItem]]:
@@ -250,22 +300,23 @@ class RCAOrchestrator:
             hypotheses = []
             # Generate data collection actions
             action_items_data = self.llm_engine.generate_action_items(
-                category.value, insufficient=True
+                category_value, insufficient=True
             )
         else:
             # Generate hypotheses that reference evidence
-            evidence_ids = [ev.evidence_id for ev in evidence_index]
-            evidence_snippets = [ev.snippet for ev in evidence_index[:3]]
+            # Only the first few evidence items are referenced; don't copy the rest
+            evidence_ids = [ev.evidence_id for ev in islice(evidence_index, 5)]
+            evidence_snippets = [ev.snippet for ev in islice(evidence_index, 3)]
 
             hypothesis_desc = self.llm_engine.generate_hypothesis_description(
-                category.value, evidence_snippets
+                category_value, evidence_snippets
             )
 
             hypotheses.append(
-                Hypothesis(
-                    title=f"{category.value.replace('_', ' ').title()} Root Cause",
+                Hypothesis.model_construct(
+                    title=f"{category_title} Root Cause",
                     description=hypothesis_desc,
-                    evidence_ids=evidence_ids[:5],  # Reference relevant evidence
+                    evidence_ids=evidence_ids,  # Reference relevant evidence
                     confidence="high" if len(evidence_ids) >= 2 else "medium",
                     verification_steps=[
                         "Review tool call logs for detailed error traces",
@@ -278,17 +329,17 @@ class RCAOrchestrator:
 
             # Generate category-specific actions
             action_items_data = self.llm_engine.generate_action_items(
-                category.value, insufficient=False
+                category_value, insufficient=False
             )
 
         # Convert action items to Pydantic models
         for item in action_items_data:
             action_items.append(
-                ActionItem(
-                    type=ActionItemType(item["type"]),
+                ActionItem.model_construct(
+                    type=_ACTION_TYPE_MAP[item["type"]],
                     title=item["title"],
                     description=item["description"],
-                    priority=ActionItemPriority(item["priority"]),
+                    priority=_PRIORITY_MAP[item["priority"]],
                     owner=item.get("owner"),
                     due_in_days=item.get("due_in_days"),
                 )
@@ -296,23 +347,11 @@ class RCAOrchestrator:
 
         return hypotheses, action_items
 
-    def _compile_metrics(self, agent_run_data: dict) -> MetricsSnapshot:
+    def _compile_metrics(self, agent_run_data: dict, scan: TelemetryScan) -> MetricsSnapshot:
         """Compile metrics snapshot."""
         # Find top failing tool
-        tool_failures = {}
-        for tool_call in agent_run_data["tool_calls"]:
-            if tool_call.status == "failure":
-                tool_failures[tool_call.tool_name] = tool_failures.get(tool_call.tool_name, 0) + 1
-
-        top_failing_tool = max(tool_failures.items(), key=lambda x: x[1])[0] if tool_failures else None
-
-        # Max step latency
-        max_latency = max((step.latency_ms for step in agent_run_data["steps"]), default=0)
-
-        # Total retries
-        total_retries = sum(step.retries for step in agent_run_data["steps"]) + sum(
-            tc.retries for tc in agent_run_data["tool_calls"]
-        )
+        tool_failures = scan.tool_failures
+        top_failing_tool = tool_failures.most_common(1)[0][0] if tool_failures else None
 
         # Cost
         cost_data = agent_run_data["run"].cost
@@ -320,48 +359,47 @@ class RCAOrchestrator:
 
         return MetricsSnapshot(
             top_failing_tool=top_failing_tool,
-            max_step_latency_ms=max_latency,
-            total_retries=total_retries,
+            max_step_latency_ms=scan.max_step_latency_ms,
+            total_retries=scan.total_retries,
             total_cost_usd=total_cost,
         )
 
     def _generate_jira_fields(
         self,
         run_id: str,
-        category: RCACategory,
+        category_value: str,
+        category_title: str,
         hypotheses: list[Hypothesis],
         action_items: list[ActionItem],
         insufficient_evidence: bool,
     ) -> JiraFields:
         """Generate Jira ticket fields."""
-        summary = f"[AgentOps RCA] {category.value.replace('_', ' ').title()} - Run {run_id[:8]}"
-
-        description_parts = [
-            f"# RCA Report: {category.value}",
-            f"**Run ID:** {run_id}",
-            f"**Insufficient Evidence:** {insufficient_evidence}",
-            "",
-            "## Hypotheses",
-        ]
-
-        if hypotheses:
-            for hyp in hypotheses:
-                description_parts.append(f"### {hyp.title}")
-                description_parts.append(f"- **Confidence:** {hyp.confidence}")
-                description_parts.append(f"- **Description:** {hyp.description}")
-                description_parts.append(f"- **Evidence Count:** {len(hyp.evidence_ids)}")
-        else:
-            description_parts.append("*Insufficient evidence to form hypotheses. Data collection required.*")
-
-        description_parts.append("")
-        description_parts.append("## Action Items")
-        for action in action_items:
-            description_parts.append(
-                f"- [{action.priority.value.upper()}] **{action.title}** ({action.type.value})"
-            )
-            description_parts.append(f"  {action.description}")
+        summary = f"[AgentOps RCA] {category_title} - Run {run_id[:8]}"
+
+        # Build each section in one join and the document in one f-string
+        hypotheses_md = "\n".join(
+            f"### {hyp.title}\n"
+            f"- **Confidence:** {hyp.confidence}\n"
+            f"- **Description:** {hyp.description}\n"
+            f"- **Evidence Count:** {len(hyp.evidence_ids)}"
+            for hyp in hypotheses
+        ) or "*Insufficient evidence to form hypotheses. Data collection required.*"
+        action_items_md = "".join(
+            f"\n- [{action.priority.value.upper()}] **{action.title}** ({action.type.value})"
+            f"\n  {action.description}"
+            for action in action_items
+        )
 
         return JiraFields(
             jira_summary=summary,
-            jira_description_md="\n".join(description_parts),
+            jira_description_md=(
+                f"# RCA Report: {category_value}\n"
+                f"**Run ID:** {run_id}\n"
+                f"**Insufficient Evidence:** {insufficient_evidence}\n"
+                f"\n"
+                f"## Hypotheses\n"
+                f"{hypotheses_md}\n"
+                f"\n"
+                f"## Action Items{action_items_md}"
+            ),
         )
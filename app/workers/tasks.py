@@ -1,6 +1,7 @@
-from sqlmodel import Session
-from app.core.db import engine
+from app.core.db import SessionLocal
 from app.core.logging import setup_logging, get_logger
+from app.schemas.rca import RCARunStatus
+from app.services.progress import ProgressService
 from app.use_cases.rca_orchestrator import RCAOrchestrator
 
 setup_logging()
@@ -11,8 +12,15 @@ def run_rca_job(rca_run_id: str) -> None:
     """RQ task to run RCA analysis."""
     logger.info(f"Starting RCA job for {rca_run_id}")
 
-    with Session(engine) as session:
-        orchestrator = RCAOrchestrator(session)
+    # DONE is only published after the report is committed, so a cached "done"
+    # lets re-enqueued jobs return without touching the database
+    progress_service = ProgressService()
+    if progress_service.get_status(rca_run_id) == RCARunStatus.DONE:
+        logger.info(f"RCA run {rca_run_id} already completed, skipping")
+        return
+
+    with SessionLocal() as session:
+        orchestrator = RCAOrchestrator(session, progress_service=progress_service)
         orchestrator.run_rca_analysis(rca_run_id)
 
     logger.info(f"Completed RCA job for {rca_run_id}")
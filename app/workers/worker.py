@@ -1,9 +1,10 @@
 #!/usr/bin/env python
 """RQ Worker for processing RCA jobs."""
+import os
 import sys
-from rq import Worker
+from rq.worker_pool import WorkerPool
 from app.core.redis_clients import get_sync_redis
-from app.core.settings import settings
+from app.core.settings import get_settings
 from app.core.logging import setup_logging, get_logger
 
 setup_logging()
@@ -11,13 +12,19 @@ logger = get_logger(__name__)
 
 
 def main():
-    """Start RQ worker."""
+    """Start a pool of RQ workers."""
     redis_conn = get_sync_redis()
-    queues = [settings.rq_queue_name]
 
-    logger.info(f"Starting RQ worker for queues: {queues}")
-    worker = Worker(queues, connection=redis_conn)
-    worker.work()
+    # Import the task module (engine, session factory, orchestrator) once here,
+    # so each forked job process inherits it instead of importing it per job
+    import app.workers.tasks  # noqa: F401
+
+    queues = [get_settings().rq_queue_name]
+    num_workers = get_settings().rq_worker_count or os.cpu_count() or 1
+
+    logger.info(f"Starting {num_workers} RQ workers for queues: {queues}")
+    pool = WorkerPool(queues, connection=redis_conn, num_workers=num_workers)
+    pool.start(logging_level=get_settings().log_level)
 
 
 if __name__ == "__main__":
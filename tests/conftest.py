@@ -0,0 +1,15 @@
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One TestClient for the whole session; startup/shutdown run once.
+
+    The app is imported here rather than at module level, so test modules that
+    don't need the HTTP layer never build it.
+    """
+    from app.main import app
+
+    with TestClient(app) as c:
+        yield c
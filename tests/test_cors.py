@@ -0,0 +1,187 @@
+import asyncio
+
+from app.core.cors_asgi import PureCORSMiddleware
+
+ORIGIN = b"http://localhost:3000"
+
+
+class DummyApp:
+    """ASGI app that records the scope and answers 200 with a Vary header."""
+
+    def __init__(self):
+        self.scopes = []
+
+    async def __call__(self, scope, receive, send):
+        self.scopes.append(scope)
+        if scope["type"] != "http":
+            return
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/json"), (b"vary", b"Accept-Encoding")],
+            }
+        )
+        await send({"type": "http.response.body", "body": b"{}"})
+
+
+def make_middleware(**kwargs):
+    app = DummyApp()
+    options = {
+        "allow_origins": ["http://localhost:3000"],
+        "allow_methods": ["GET", "POST"],
+        "allow_headers": ["X-Request-ID"],
+        "allow_credentials": True,
+        "max_age": 300,
+    }
+    options.update(kwargs)
+    return app, PureCORSMiddleware(app, **options)
+
+
+def call(middleware, method="GET", headers=(), scope_type="http"):
+    """Run one request through the middleware and return the sent messages."""
+    scope = {"type": scope_type, "method": method, "path": "/", "headers": list(headers)}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return messages
+
+
+def start_headers(messages) -> dict[bytes, bytes]:
+    start = messages[0]
+    assert start["type"] == "http.response.start"
+    return dict(start["headers"])
+
+
+def preflight(middleware, origin=ORIGIN, method=b"POST", request_headers=None):
+    headers = [(b"origin", origin), (b"access-control-request-method", method)]
+    if request_headers is not None:
+        headers.append((b"access-control-request-headers", request_headers))
+    return call(middleware, method="OPTIONS", headers=headers)
+
+
+def test_preflight_allowed_origin():
+    """Allowed preflights are answered with 204 without reaching the app."""
+    app, middleware = make_middleware()
+
+    messages = preflight(middleware, request_headers=b"X-Request-ID, Content-Type")
+
+    assert messages[0]["status"] == 204
+    headers = start_headers(messages)
+    assert headers[b"access-control-allow-origin"] == ORIGIN
+    assert headers[b"access-control-allow-methods"] == b"GET, POST"
+    assert headers[b"access-control-max-age"] == b"300"
+    assert headers[b"access-control-allow-credentials"] == b"true"
+    allowed = {h.strip() for h in headers[b"access-control-allow-headers"].split(b",")}
+    assert {b"x-request-id", b"content-type"} <= allowed
+    assert headers[b"vary"] == b"Origin"
+    assert app.scopes == []
+
+
+def test_preflight_echoes_requested_headers_when_all_allowed():
+    _, middleware = make_middleware(allow_headers=["*"])
+
+    messages = preflight(middleware, request_headers=b"X-Custom, X-Other")
+
+    assert messages[0]["status"] == 204
+    assert start_headers(messages)[b"access-control-allow-headers"] == b"X-Custom, X-Other"
+
+
+def test_preflight_rejects_disallowed_origin():
+    _, middleware = make_middleware()
+
+    messages = preflight(middleware, origin=b"http://evil.example")
+
+    assert messages[0]["status"] == 400
+    assert messages[1]["body"] == b"Disallowed CORS origin"
+
+
+def test_preflight_rejects_disallowed_method():
+    _, middleware = make_middleware()
+
+    messages = preflight(middleware, method=b"DELETE")
+
+    assert messages[0]["status"] == 400
+    assert messages[1]["body"] == b"Disallowed CORS method"
+
+
+def test_preflight_rejects_disallowed_header():
+    _, middleware = make_middleware()
+
+    messages = preflight(middleware, request_headers=b"X-Request-ID, X-Forbidden")
+
+    assert messages[0]["status"] == 400
+    assert messages[1]["body"] == b"Disallowed CORS headers"
+
+
+def test_credentialed_request_echoes_origin_and_merges_vary():
+    """With credentials the origin is echoed and Origin is added to the app's Vary."""
+    app, middleware = make_middleware()
+
+    messages = call(middleware, headers=[(b"origin", ORIGIN)])
+
+    assert messages[0]["status"] == 200
+    headers = start_headers(messages)
+    assert headers[b"access-control-allow-origin"] == ORIGIN
+    assert headers[b"access-control-allow-credentials"] == b"true"
+    assert headers[b"vary"] == b"Accept-Encoding, Origin"
+    assert [name for name, _ in messages[0]["headers"]].count(b"vary") == 1
+    assert len(app.scopes) == 1
+
+
+def test_existing_vary_origin_is_not_duplicated():
+    """An app that already varies on Origin keeps a single Origin token."""
+
+    async def app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"vary", b"Accept, origin")],
+            }
+        )
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = PureCORSMiddleware(app, allow_origins=["http://localhost:3000"])
+
+    messages = call(middleware, headers=[(b"origin", ORIGIN)])
+
+    assert start_headers(messages)[b"vary"] == b"Accept, origin"
+
+
+def test_wildcard_origin_without_credentials():
+    _, middleware = make_middleware(allow_origins=["*"], allow_credentials=False)
+
+    messages = call(middleware, headers=[(b"origin", b"http://any.example")])
+
+    headers = start_headers(messages)
+    assert headers[b"access-control-allow-origin"] == b"*"
+    assert headers[b"vary"] == b"Accept-Encoding"
+
+
+def test_disallowed_origin_passes_through_untouched():
+    app, middleware = make_middleware()
+
+    messages = call(middleware, headers=[(b"origin", b"http://evil.example")])
+
+    assert messages[0]["status"] == 200
+    assert messages[0]["headers"] == [
+        (b"content-type", b"application/json"),
+        (b"vary", b"Accept-Encoding"),
+    ]
+    assert len(app.scopes) == 1
+
+
+def test_non_http_scope_goes_straight_to_app():
+    app, middleware = make_middleware()
+
+    messages = call(middleware, headers=[(b"origin", ORIGIN)], scope_type="websocket")
+
+    assert messages == []
+    assert app.scopes[0]["type"] == "websocket"
@@ -1,21 +1,20 @@
 import pytest
-from fastapi.testclient import TestClient
-from datetime import datetime
-from app.main import app
+from app.core.time import utcnow
 
-client = TestClient(app)
+# One timestamp for every payload in the module
+NOW_ISO = utcnow().isoformat()
 
 
-def test_ingest_agent_run():
-    """Test ingesting an agent run."""
-    payload = {
+def make_payload() -> dict:
+    """Failed agent run with one step and one failed tool call."""
+    return {
         "run_id": "test-run-001",
         "agent_name": "test-agent",
         "agent_version": "1.0.0",
         "model": "gpt-4",
         "environment": "dev",
-        "started_at": datetime.utcnow().isoformat(),
-        "ended_at": datetime.utcnow().isoformat(),
+        "started_at": NOW_ISO,
+        "ended_at": NOW_ISO,
         "status": "failure",
         "error_type": "ToolCallError",
         "error_message": "Schema validation failed",
@@ -24,8 +23,8 @@ def test_ingest_agent_run():
                 "step_id": "step-1",
                 "name": "Planning",
                 "status": "success",
-                "started_at": datetime.utcnow().isoformat(),
-                "ended_at": datetime.utcnow().isoformat(),
+                "started_at": NOW_ISO,
+                "ended_at": NOW_ISO,
                 "input_summary": "Plan task",
                 "output_summary": "Created plan",
                 "retries": 0,
@@ -49,22 +48,44 @@ def test_ingest_agent_run():
         "cost": {"tokens_prompt": 100, "tokens_completion": 50, "total_cost_usd": 0.01},
     }
 
-    response = client.post("/agent-runs", json=payload)
+
+@pytest.fixture(scope="module")
+def ingested_run(client) -> str:
+    """Ingest the test run once and return its run_id."""
+    response = client.post("/agent-runs", json=make_payload())
+    assert response.status_code == 200
+    return response.json()["run_id"]
+
+
+def test_ingest_agent_run(client):
+    """Test ingesting an agent run."""
+    response = client.post("/agent-runs", json=make_payload())
     assert response.status_code == 200
     data = response.json()
     assert "run_id" in data
     assert data["run_id"] == "test-run-001"
 
 
-def test_get_agent_run():
+def test_get_agent_run(client, ingested_run):
     """Test retrieving an agent run."""
-    # First ingest
-    test_ingest_agent_run()
-
-    # Then retrieve
-    response = client.get("/agent-runs/test-run-001")
+    response = client.get(f"/agent-runs/{ingested_run}")
     assert response.status_code == 200
     data = response.json()
     assert data["run_id"] == "test-run-001"
     assert data["agent_name"] == "test-agent"
     assert data["status"] == "failure"
+
+
+def test_ingest_requires_secret_when_configured(client, monkeypatch):
+    """The ingest secret is read per request, so settings changes take effect."""
+    from app.core.settings import get_settings
+
+    monkeypatch.setattr(get_settings(), "app_ingest_secret", "s3cret")
+
+    response = client.post("/agent-runs", json=make_payload())
+    assert response.status_code == 403
+
+    response = client.post(
+        "/agent-runs", json=make_payload(), headers={"X-Ingest-Secret": "s3cret"}
+    )
+    assert response.status_code == 200
@@ -0,0 +1,117 @@
+import io
+import logging
+import queue
+import sys
+import threading
+
+import orjson
+
+import app.core.logging as app_logging
+from app.core.logging import (
+    BatchingQueueListener,
+    JSONFormatter,
+    JSONStdoutHandler,
+    RequestContextQueueHandler,
+    request_id_var,
+)
+
+
+class CollectingHandler(logging.Handler):
+    """Keep every handled record in memory."""
+
+    def __init__(self):
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+def _make_logger(name: str, handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def test_request_id_is_captured_on_calling_thread():
+    """The queued record carries the request_id of the thread that logged it."""
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    logger = _make_logger("test.logging.request_id", RequestContextQueueHandler(log_queue))
+
+    def log_in_request():
+        token = request_id_var.set("req-123")
+        try:
+            logger.info("hello %s", "world")
+        finally:
+            request_id_var.reset(token)
+
+    worker = threading.Thread(target=log_in_request)
+    worker.start()
+    worker.join()
+
+    record = log_queue.get_nowait()
+    assert record.request_id == "req-123"
+    assert record.getMessage() == "hello world"
+
+    # Formatting happens where request_id_var is unset, as on the listener thread
+    data = orjson.loads(JSONFormatter().format(record))
+    assert data["request_id"] == "req-123"
+    assert data["message"] == "hello world"
+
+
+def test_exception_is_rendered_before_queueing():
+    """Tracebacks are rendered to exc_text so no live traceback is queued."""
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    logger = _make_logger("test.logging.exc", RequestContextQueueHandler(log_queue))
+
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("failed")
+
+    record = log_queue.get_nowait()
+    assert record.exc_info is None
+    assert "Traceback" in record.exc_text
+    assert "ValueError: boom" in record.exc_text
+
+    data = orjson.loads(JSONFormatter().format(record))
+    assert data["exception"] == record.exc_text
+
+
+def test_stop_listener_drains_queue(monkeypatch):
+    """Records still queued at shutdown are handled before the listener exits."""
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    collector = CollectingHandler()
+    listener = BatchingQueueListener(log_queue, collector)
+    monkeypatch.setattr(app_logging, "_listener", listener)
+    logger = _make_logger("test.logging.drain", RequestContextQueueHandler(log_queue))
+
+    listener.start()
+    for i in range(200):
+        logger.info("record %d", i)
+    app_logging._stop_listener()
+
+    assert [r.getMessage() for r in collector.records] == [
+        f"record {i}" for i in range(200)
+    ]
+    assert app_logging._listener is None
+
+
+def test_stdout_handler_keeps_order_with_print(monkeypatch):
+    """JSON lines interleave correctly with other writers to sys.stdout."""
+    raw = io.BytesIO()
+    stdout = io.TextIOWrapper(raw, encoding="utf-8")
+    monkeypatch.setattr(sys, "stdout", stdout)
+    logger = _make_logger("test.logging.stdout", JSONStdoutHandler())
+
+    print("before")
+    logger.info("json line")
+    print("after")
+    stdout.flush()
+
+    lines = raw.getvalue().decode("utf-8").splitlines()
+    assert lines[0] == "before"
+    assert orjson.loads(lines[1])["message"] == "json line"
+    assert lines[2] == "after"
@@ -0,0 +1,55 @@
+from datetime import datetime
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+import app.models.rca_run  # noqa: F401  (registers every table on the metadata)
+from app.repositories.agent_run_repo import AgentRunRepository
+from app.schemas.agent_run import AgentRunPayload, AgentStep
+
+
+def make_engine():
+    """Private in-memory database, so steps from other tests don't count."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def test_p95_step_latency_uses_index_of_95th_percentile():
+    """P95 over 20 steps is the sorted latency at index floor(20 * 95 / 100) = 19."""
+    engine = make_engine()
+    started_at = datetime(2024, 1, 1)
+
+    with Session(engine) as session:
+        repo = AgentRunRepository(session)
+        repo.upsert_agent_run(
+            AgentRunPayload(
+                run_id="test-p95-001",
+                agent_name="test-agent",
+                agent_version="1.0.0",
+                model="gpt-4",
+                environment="dev",
+                started_at=started_at,
+                ended_at=started_at,
+                status="success",
+                steps=[
+                    AgentStep(
+                        step_id=f"step-p95-{i}",
+                        name="Step",
+                        status="success",
+                        started_at=started_at,
+                        ended_at=started_at,
+                        input_summary="in",
+                        output_summary="out",
+                        latency_ms=i * 100,
+                    )
+                    # Inserted out of order so the query has to sort
+                    for i in (7, 20, 3, 12, 1, 18, 9, 15, 5, 11, 19, 2, 14, 8, 17, 4, 13, 6, 16, 10)
+                ],
+            )
+        )
+
+        assert repo.get_metrics_overview()["p95_step_latency_ms"] == 2000
+
+
+def test_p95_step_latency_without_steps_is_zero():
+    with Session(make_engine()) as session:
+        assert AgentRunRepository(session).get_metrics_overview()["p95_step_latency_ms"] == 0
@@ -1,22 +1,21 @@
 import pytest
-from fastapi.testclient import TestClient
-from datetime import datetime
-from app.main import app
+from app.core.time import utcnow
 
-client = TestClient(app)
+# One timestamp for every payload in the module
+NOW_ISO = utcnow().isoformat()
 
 
-def test_create_rca_run():
-    """Test creating an RCA run."""
-    # First ingest an agent run
+@pytest.fixture(scope="module")
+def rca_run_id(client) -> str:
+    """Ingest a rate-limited agent run, create an RCA run for it and return its id."""
     payload = {
         "run_id": "test-run-rca-001",
         "agent_name": "test-agent",
         "agent_version": "1.0.0",
         "model": "gpt-4",
         "environment": "dev",
-        "started_at": datetime.utcnow().isoformat(),
-        "ended_at": datetime.utcnow().isoformat(),
+        "started_at": NOW_ISO,
+        "ended_at": NOW_ISO,
         "status": "failure",
         "error_type": "RateLimitError",
         "error_message": "Rate limit exceeded",
@@ -25,8 +24,8 @@ def test_create_rca_run():
                 "step_id": "step-1",
                 "name": "Execute",
                 "status": "failure",
-                "started_at": datetime.utcnow().isoformat(),
-                "ended_at": datetime.utcnow().isoformat(),
+                "started_at": NOW_ISO,
+                "ended_at": NOW_ISO,
                 "input_summary": "Execute API call",
                 "output_summary": "Failed with rate limit",
                 "retries": 1,
@@ -58,9 +57,11 @@ def test_create_rca_run():
     assert response.status_code == 200
     data = response.json()
     assert "rca_run_id" in data
+    return data["rca_run_id"]
 
-    rca_run_id = data["rca_run_id"]
 
+def test_create_rca_run(client, rca_run_id):
+    """Test creating an RCA run."""
     # Get RCA run status
     response = client.get(f"/agent-runs/rca-runs/{rca_run_id}")
     assert response.status_code == 200
@@ -70,14 +71,57 @@ def test_create_rca_run():
     assert data["status"] in ["queued", "running", "done"]
 
 
-def test_rca_run_idempotency():
+def test_rca_run_idempotency(client, rca_run_id):
     """Test that duplicate RCA runs are not created."""
-    # Create first RCA run
-    test_create_rca_run()
-
     # Try to create another immediately
     response = client.post("/agent-runs/test-run-rca-001/rca-runs")
     assert response.status_code == 200
     data = response.json()
     # Should return existing RCA run ID
-    assert "rca_run_id" in data
+    assert data["rca_run_id"] == rca_run_id
+
+
+def test_create_rca_runs_bulk(client):
+    """Test creating RCA runs for several agent runs in one request."""
+    for run_id in ["test-run-bulk-001", "test-run-bulk-002"]:
+        payload = {
+            "run_id": run_id,
+            "agent_name": "test-agent",
+            "agent_version": "1.0.0",
+            "model": "gpt-4",
+            "environment": "dev",
+            "started_at": NOW_ISO,
+            "ended_at": NOW_ISO,
+            "status": "failure",
+            "error_type": "TimeoutError",
+            "error_message": "Request timed out",
+            "steps": [],
+            "tool_calls": [],
+            "guardrail_events": [],
+            "cost": {},
+        }
+        response = client.post("/agent-runs", json=payload)
+        assert response.status_code == 200
+
+    response = client.post(
+        "/agent-runs/rca-runs",
+        json={"run_ids": ["test-run-bulk-001", "test-run-bulk-002", "missing-run"]},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["rca_run_ids"]) == {"test-run-bulk-001", "test-run-bulk-002"}
+    assert data["not_found"] == ["missing-run"]
+
+    # Runs with an RCA already in flight get the existing RCA run back
+    response = client.post("/agent-runs/rca-runs", json={"run_ids": ["test-run-bulk-001"]})
+    assert response.status_code == 200
+    assert response.json()["rca_run_ids"] == {
+        "test-run-bulk-001": data["rca_run_ids"]["test-run-bulk-001"]
+    }
+
+
+def test_create_rca_runs_bulk_rejects_too_many_ids(client):
+    """Bulk requests are capped at 500 run IDs."""
+    run_ids = [f"test-run-bulk-cap-{i}" for i in range(501)]
+    response = client.post("/agent-runs/rca-runs", json={"run_ids": run_ids})
+    assert response.status_code == 422
@@ -1,7 +1,6 @@
-import pytest
 from sqlmodel import Session
-from datetime import datetime
 from app.core.db import engine
+from app.core.time import utcnow
 from app.use_cases.rca_orchestrator import RCAOrchestrator
 from app.repositories.agent_run_repo import AgentRunRepository
 from app.repositories.rca_repo import RCARepository
@@ -24,8 +23,8 @@ def test_rca_report_sufficient_evidence():
             agent_version="1.0.0",
             model="gpt-4",
             environment="dev",
-            started_at=datetime.utcnow(),
-            ended_at=datetime.utcnow(),
+            started_at=utcnow(),
+            ended_at=utcnow(),
             status="failure",
             error_type="ToolError",
             error_message="API schema mismatch",
@@ -34,8 +33,8 @@ def test_rca_report_sufficient_evidence():
                     step_id="step-1",
                     name="API Call",
                     status="failure",
-                    started_at=datetime.utcnow(),
-                    ended_at=datetime.utcnow(),
+                    started_at=utcnow(),
+                    ended_at=utcnow(),
                     input_summary="Call external API",
                     output_summary="Failed with validation error",
                     retries=1,
@@ -100,8 +99,8 @@ def test_rca_report_insufficient_evidence():
             agent_version="1.0.0",
             model="gpt-4",
             environment="dev",
-            started_at=datetime.utcnow(),
-            ended_at=datetime.utcnow(),
+            started_at=utcnow(),
+            ended_at=utcnow(),
             status="failure",
             error_message="Internal Server Error",
             steps=[
@@ -109,8 +108,8 @@ def test_rca_report_insufficient_evidence():
                     step_id="step-1",
                     name="Process",
                     status="success",
-                    started_at=datetime.utcnow(),
-                    ended_at=datetime.utcnow(),
+                    started_at=utcnow(),
+                    ended_at=utcnow(),
                     input_summary="Processing request",
                     output_summary="Completed processing",
                     retries=0,